@@ -5,12 +5,45 @@
 """
 
 from collections import OrderedDict
+from io import StringIO
 import logging
-from typing import Dict, Iterable, List, Union
+import re
+import string
+from typing import Dict, IO, Iterable, List, Tuple, Union
 
 from antismash.common.secmet import Record
 from antismash.common.secmet.features import CDSFeature, Domain
 
+# characters permitted in sequences read from FASTA files, gaps included
+_VALID_SEQUENCE_CHARS = (string.ascii_letters + "-").encode()
+# the start of each record, which may be indented
+_RECORD_START = re.compile(rb"\n\s*>")
+# whitespace between other characters within a single line
+_INNER_WHITESPACE = re.compile(rb"\S[ \t\r\f\v]+\S")
+
+
+def write_fasta_from_features(features: Union[Iterable[CDSFeature], Iterable[Domain]],
+                              handle: IO[str], numeric_names: bool = False) -> None:
+    """ Writes multi-protein FASTA from the provided features directly to the
+        given handle, without building the full text in memory first
+
+        Arguments:
+            features: a list of CDSFeatures or a list of Domains, all of which must have a translation
+            handle: the open file handle (or other writable text stream) to write to
+            numeric_names: whether to use integer names (matching the index within the list) instead
+                           of feature names (avoiding long identifiers causing issues in external tools)
+
+        Returns:
+            None
+    """
+    write = handle.write
+    if not numeric_names:
+        for feature in features:
+            write(f">{feature.get_name()}\n{feature.translation}\n")
+    else:
+        for i, feature in enumerate(features):  # type: ignore # because mypy can't handle the union in enumerate
+            write(f">{i}\n{feature.translation}\n")
+
 
 def get_fasta_from_features(features: Union[Iterable[CDSFeature], Iterable[Domain]],
                             numeric_names: bool = False) -> str:
@@ -25,14 +58,10 @@ def get_fasta_from_features(features: Union[Iterable[CDSFeature], Iterable[Domai
             a single string containing all provided feature translations in FASTA format
 
     """
-    all_fastas = []
-    if not numeric_names:
-        for feature in features:
-            all_fastas.append(">%s\n%s" % (feature.get_name(), feature.translation))
-    else:
-        for i, feature in enumerate(features):  # type: ignore # because mypy can't handle the union in enumerate
-            all_fastas.append(">%d\n%s" % (i, feature.translation))
-    return "\n".join(all_fastas)
+    handle = StringIO()
+    write_fasta_from_features(features, handle, numeric_names=numeric_names)
+    # the final record has no trailing newline
+    return handle.getvalue()[:-1]
 
 
 def get_fasta_from_record(record: Record) -> str:
@@ -44,19 +73,13 @@ def get_fasta_from_record(record: Record) -> str:
         Returns:
             a string containing all CDSFeature labels and sequences in FASTA format
     """
-    features = record.get_cds_features()
-    all_fastas = []
-    for feature in features:
-        gene_id = feature.get_name()
-        fasta_seq = feature.translation
-        all_fastas.append(">%s\n%s" % (gene_id, fasta_seq))
-    return "\n".join(all_fastas)
+    return get_fasta_from_features(record.get_cds_features())
 
 
 def write_fasta(names: List[str], seqs: List[str], filename: str) -> None:
     """ Writes name/sequence pairs to file in FASTA format
 
-        Argumnets:
+        Arguments:
             names: a list of sequence identifiers
             seqs: a list of sequences as strings
             filename: the filename to write the FASTA formatted data to
@@ -64,46 +87,128 @@ def write_fasta(names: List[str], seqs: List[str], filename: str) -> None:
         Returns:
             None
     """
-    out_file = open(filename, "w")
-    for name, seq in zip(names, seqs):
-        out_file.write(">%s\n%s\n" % (name, seq))
-    out_file.close()
+    # writing pre-encoded bytes skips the text layer's encoding of each chunk
+    with open(filename, "wb", buffering=1024 * 1024) as out_file:
+        out_file.writelines(f">{name}\n{seq}\n".encode() for name, seq in zip(names, seqs))
 
 
-def read_fasta(filename: str) -> Dict[str, str]:
-    """ Reads a fasta file into a dictionary
+def _parse_fasta(data: bytes) -> Tuple[List[str], List[str]]:
+    """ Splits raw FASTA data into identifiers and sequences
 
         Arguments:
-            filename: the path to the FASTA file to read
+            data: the full contents of a FASTA file
 
         Returns:
-            a dictionary mapping sequence ID to sequence
+            a tuple of
+                a list of sequence identifiers
+                a list of sequences, with one entry for each record that has a sequence
+    """
+    # the byte-level handling only covers ASCII letters and whitespace
+    if not data.isascii():
+        return _parse_fasta_lines(data.decode())
+
+    # line endings are normalised as reading in text mode would,
+    # and prefixing a newline lets the first record be split like all others
+    data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    blocks = _RECORD_START.split(b"\n" + data)
+    if blocks[0].strip():
+        raise ValueError("Sequence before identifier in fasta file")
+    ids = []
+    sequence_info = []
+    for block in blocks[1:]:
+        header, _, body = block.partition(b"\n")
+        ids.append(header.decode().rstrip().replace(" ", "_"))
+        # whitespace is only allowed around each line of sequence, not within it
+        if _INNER_WHITESPACE.search(body):
+            raise ValueError("Sequence contains non-alphabetic characters")
+        sequence = b"".join(body.split())
+        if not sequence:
+            continue
+        # anything left after removing all valid characters is invalid
+        if sequence.translate(None, _VALID_SEQUENCE_CHARS):
+            raise ValueError("Sequence contains non-alphabetic characters")
+        sequence_info.append(sequence.decode())
+    return ids, sequence_info
+
+
+def _parse_fasta_lines(text: str) -> Tuple[List[str], List[str]]:
+    """ Splits FASTA text into identifiers and sequences line by line, allowing
+        for any letters and whitespace, not only those in ASCII
 
+        Arguments:
+            text: the full contents of a FASTA file
+
+        Returns:
+            a tuple of
+                a list of sequence identifiers
+                a list of sequences, with one entry for each record that has a sequence
     """
     ids = []
     sequence_info = []
-    with open(filename, "r") as fasta:
-        current_seq: List[str] = []
-        for line in fasta:
-            line = line.strip()
-            if not line:
-                continue
-            if line[0] == '>':
-                ids.append(line[1:].replace(" ", "_"))
-                if current_seq:
-                    sequence_info.append("".join(current_seq))
-                    current_seq.clear()
-            else:
-                if not ids:
-                    raise ValueError("Sequence before identifier in fasta file")
-                if not line.replace("-", "z").isalpha():
-                    raise ValueError("Sequence contains non-alphabetic characters")
-                current_seq.append(line)
+    current_seq: List[str] = []
+    # iterating over a text stream splits lines the same way reading the file would
+    for line in StringIO(text, newline=None):
+        line = line.strip()
+        if not line:
+            continue
+        if line[0] == '>':
+            ids.append(line[1:].replace(" ", "_"))
+            if current_seq:
+                sequence_info.append("".join(current_seq))
+                current_seq.clear()
+        else:
+            if not ids:
+                raise ValueError("Sequence before identifier in fasta file")
+            if not line.replace("-", "z").isalpha():
+                raise ValueError("Sequence contains non-alphabetic characters")
+            current_seq.append(line)
     if current_seq:
         sequence_info.append("".join(current_seq))
+    return ids, sequence_info
+
+
+def _build_fasta_dict(ids: List[str], sequence_info: List[str]) -> Dict[str, str]:
+    """ Pairs up parsed identifiers and sequences, raising an error if they
+        don't match up
+
+        Arguments:
+            ids: the sequence identifiers
+            sequence_info: the sequences
+
+        Returns:
+            a dictionary mapping sequence ID to sequence
+    """
     if len(ids) != len(sequence_info):
         raise ValueError("Fasta files contains different counts of sequences and ids")
     if not ids:
-        logging.debug("Fasta file %s contains no sequences", filename)
         raise ValueError("Fasta file contains no sequences")
     return OrderedDict(zip(ids, sequence_info))
+
+
+def parse_fasta(text: str) -> Dict[str, str]:
+    """ Parses FASTA formatted text into a dictionary
+
+        Arguments:
+            text: the FASTA formatted text
+
+        Returns:
+            a dictionary mapping sequence ID to sequence
+    """
+    return _build_fasta_dict(*_parse_fasta(text.encode()))
+
+
+def read_fasta(filename: str) -> Dict[str, str]:
+    """ Reads a fasta file into a dictionary
+
+        Arguments:
+            filename: the path to the FASTA file to read
+
+        Returns:
+            a dictionary mapping sequence ID to sequence
+
+    """
+    with open(filename, "rb") as handle:
+        ids, sequence_info = _parse_fasta(handle.read())
+    if not ids:
+        logging.debug("Fasta file %s contains no sequences", filename)
+    return _build_fasta_dict(ids, sequence_info)
@@ -5,8 +5,10 @@
 """
 
 
+from io import StringIO
 import logging
-from typing import Dict, IO, List, Set
+from operator import attrgetter
+from typing import Dict, IO, List, Optional, Set
 
 from Bio.SeqFeature import FeatureLocation, CompoundLocation, SeqFeature
 from Bio.SeqRecord import SeqRecord
@@ -34,12 +36,15 @@ def check_gff_suitability(gff_file: str, sequences: List[SeqRecord]) -> None:
         Returns:
             None
     """
+    # read the file only once, since the examination requires multiple passes
+    # and since the GFF library closes handles it is given, each pass needs its own
+    with open(gff_file) as handle:
+        gff_content = handle.read()
     try:
         examiner = GFF.GFFExaminer()
-        # file handle is automatically closed by GFF lib
-        gff_data = examiner.available_limits(open(gff_file))
+        gff_data = examiner.available_limits(StringIO(gff_content))
         # Check if at least one GFF locus appears in sequence
-        gff_ids = set(n[0] for n in gff_data['gff_id'])
+        gff_ids = {n[0] for n in gff_data['gff_id']}
 
         if len(gff_ids) == 1 and len(sequences) == 1:
             # If both inputs only have one record, assume is the same,
@@ -48,7 +53,7 @@ def check_gff_suitability(gff_file: str, sequences: List[SeqRecord]) -> None:
                          "the same as long as coordinates are compatible.")
             limit_info = dict(gff_type=['CDS'])
 
-            record_iter = GFF.parse(open(gff_file), limit_info=limit_info)
+            record_iter = GFF.parse(StringIO(gff_content), limit_info=limit_info)
             try:
                 record = next(record_iter)
             except StopIteration:
@@ -62,7 +67,7 @@ def check_gff_suitability(gff_file: str, sequences: List[SeqRecord]) -> None:
                 logging.error('GFF3 record and sequence coordinates are not compatible.')
                 raise AntismashInputError('incompatible GFF record and sequence coordinates')
 
-        elif not gff_ids.intersection({seq.id for seq in sequences}):
+        elif not any(seq.id in gff_ids for seq in sequences):
             logging.error('No GFF3 record IDs match any sequence record IDs.')
             raise AntismashInputError("GFF3 record IDs don't match sequence file record IDs.")
 
@@ -72,7 +77,7 @@ def check_gff_suitability(gff_file: str, sequences: List[SeqRecord]) -> None:
             raise AntismashInputError("no CDS features in GFF3 file.")
 
         # Check CDS are childless but not parentless
-        if 'CDS' in set(n for key in examiner.parent_child_map(open(gff_file)) for n in key):
+        if 'CDS' in set(n for key in examiner.parent_child_map(StringIO(gff_content)) for n in key):
             logging.error('GFF3 structure is not suitable. CDS features must be childless but not parentless.')
             raise AntismashInputError('GFF3 structure is not suitable.')
 
@@ -180,11 +185,12 @@ def generate_details_from_subfeature(sub_feature: SeqFeature,
         raise AntismashInputError(str(err)) from err
     # Make sure CDSs lengths are multiple of three. Otherwise extend to next full codon.
     # This only applies for translation.
-    modulus = (end - start) % 3
-    if modulus and sub_feature.strand == 1:
-        end += 3 - modulus
-    elif modulus and sub_feature.strand == -1:
-        start -= 3 - modulus
+    padding = -(end - start) % 3  # zero if already a multiple of three
+    if padding:
+        if sub_feature.strand == 1:
+            end += padding
+        elif sub_feature.strand == -1:
+            start -= padding
     trans_locations.append(FeatureLocation(start, end, strand=sub_feature.strand))
     # For split features (CDSs), the final feature will have the same qualifiers as the children ONLY if
     # they're the same, i.e.: all children have the same "protein_ID" (key and value).
@@ -196,48 +202,80 @@ def generate_details_from_subfeature(sub_feature: SeqFeature,
     return mismatching_qualifiers
 
 
-def check_sub(feature: SeqFeature) -> List[SeqFeature]:
-    """ Recursively checks a GFF feature for any subfeatures and generates any
-        appropriate SeqFeature instances from them.
+def _build_feature_from_cds_parts(feature: SeqFeature) -> Optional[SeqFeature]:
+    """ Builds a single CDS SeqFeature from the childless CDS subfeatures
+        of the given feature, if any exist.
+
+        Arguments:
+            feature: the GFF feature to use the subfeatures of
+
+        Returns:
+            a new SeqFeature or None if the feature had no suitable subfeatures
     """
-    new_features = []
     locations: List[FeatureLocation] = []
     trans_locations: List[FeatureLocation] = []
     qualifiers: Dict[str, List[str]] = {}
     mismatching_qualifiers: Set[str] = set()
     for sub in feature.sub_features:
-        if sub.sub_features:  # If there are sub_features, go deeper
-            new_features.extend(check_sub(sub))
-        elif sub.type == 'CDS':
+        if sub.type == 'CDS' and not sub.sub_features:
             sub_mismatch = generate_details_from_subfeature(sub, qualifiers,
                                                             locations, trans_locations)
             mismatching_qualifiers.update(sub_mismatch)
 
+    # if nothing to work on
+    if not locations:
+        return None
+
     for qualifier in mismatching_qualifiers:
         del qualifiers[qualifier]
     if 'Parent' in qualifiers:
         del qualifiers['Parent']
 
-    # if nothing to work on
-    if not new_features and not locations:
-        return []
-
-    # Only works in tip of the tree, when there's no new_feature built yet. If there is,
-    # it means the script just came out of a check_sub and it's ready to return.
-    if not new_features:
-        new_loc = locations[0]
-        # construct a compound location if required
-        if len(locations) > 1:
-            locations = sorted(locations, key=lambda x: x.start.real)
-            trans_locations = sorted(trans_locations, key=lambda x: x.start.real)
-            if locations[0].strand == 1:
-                new_loc = CompoundLocation(locations)
-            else:
-                new_loc = CompoundLocation(list(reversed(locations)))
-                trans_locations = list(reversed(trans_locations))
-        new_feature = SeqFeature(new_loc)
-        new_feature.qualifiers = qualifiers
-        new_feature.type = 'CDS'
-        new_features.append(new_feature)
-
-    return new_features
+    new_loc = locations[0]
+    # construct a compound location if required
+    if len(locations) > 1:
+        locations.sort(key=attrgetter("start"))
+        if locations[0].strand == 1:
+            new_loc = CompoundLocation(locations)
+        else:
+            new_loc = CompoundLocation(list(reversed(locations)))
+    new_feature = SeqFeature(new_loc)
+    new_feature.qualifiers = qualifiers
+    new_feature.type = 'CDS'
+    return new_feature
+
+
+def check_sub(feature: SeqFeature) -> List[SeqFeature]:
+    """ Checks a GFF feature and all nested subfeatures, generating any
+        appropriate SeqFeature instances from CDS subfeatures.
+
+        Features built from deeper levels of the tree take precedence over
+        any that would be built from the CDS subfeatures of their ancestors.
+
+        Arguments:
+            feature: the GFF feature to check
+
+        Returns:
+            a list of new SeqFeatures
+    """
+    generated: Dict[int, List[SeqFeature]] = {}
+    # walk the tree in post-order with an explicit stack instead of recursing,
+    # the flag marks whether the children of that feature are already complete
+    stack = [(feature, False)]
+    while stack:
+        current, children_done = stack.pop()
+        nested = [sub for sub in current.sub_features if sub.sub_features]
+        if not children_done:
+            stack.append((current, True))
+            stack.extend((sub, False) for sub in reversed(nested))
+            continue
+        new_features = []
+        for sub in nested:
+            new_features.extend(generated.pop(id(sub)))
+        # CDS parts are always checked for errors, but a feature built from them is
+        # only used in tip of the tree, when there's no new feature built by a child
+        new_feature = _build_feature_from_cds_parts(current)
+        if new_feature and not new_features:
+            new_features.append(new_feature)
+        generated[id(current)] = new_features
+    return generated[id(feature)]
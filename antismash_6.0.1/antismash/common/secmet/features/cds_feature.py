@@ -237,9 +237,9 @@ class CDSFeature(Feature):
 
     def get_name(self) -> str:
         "Get the gene ID from locus_tag, gene name or protein id, in that order"
-        for val in [self.locus_tag, self.gene, self.protein_id]:
-            if val:
-                return val
+        name = self.locus_tag or self.gene or self.protein_id
+        if name:
+            return name
         raise ValueError("%s altered to contain no identifiers" % self)
 
     @classmethod
@@ -5,7 +5,7 @@
 
 from collections import OrderedDict
 import os
-from typing import Any, Dict, List, Optional, Set, Tuple, Type, TypeVar, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar, Union
 import warnings
 
 from Bio.SeqFeature import SeqFeature
@@ -27,6 +27,59 @@ from ..locations import (
 T = TypeVar("T", bound="Region")
 
 
+def _renumber_qualifier(feature: SeqFeature, qualifier: str, offset: int) -> None:
+    """ Adds the given offset to all numbers in the given qualifier of the feature """
+    feature.qualifiers[qualifier] = [str(int(num) + offset) for num in feature.qualifiers[qualifier]]
+
+
+def _renumber_region(feature: SeqFeature, offsets: Dict[str, int]) -> None:
+    """ Renumbers the candidate clusters referenced by a region """
+    if feature.qualifiers.get("candidate_cluster_numbers"):
+        _renumber_qualifier(feature, "candidate_cluster_numbers", offsets["candidate"])
+
+
+def _renumber_candidate_cluster(feature: SeqFeature, offsets: Dict[str, int]) -> None:
+    """ Renumbers a candidate cluster and the protoclusters it references """
+    _renumber_qualifier(feature, "candidate_cluster_number", offsets["candidate"])
+    _renumber_qualifier(feature, "protoclusters", offsets["protocluster"])
+
+
+def _renumber_protocluster(feature: SeqFeature, offsets: Dict[str, int]) -> None:
+    """ Renumbers a protocluster or protocluster core """
+    _renumber_qualifier(feature, "protocluster_number", offsets["protocluster"])
+
+
+def _renumber_subregion(feature: SeqFeature, offsets: Dict[str, int]) -> None:
+    """ Renumbers a subregion """
+    _renumber_qualifier(feature, "subregion_number", offsets["subregion"])
+
+
+def _relocate_motif_components(feature: SeqFeature, offsets: Dict[str, int]) -> None:
+    """ Shifts the locations of RiPP components stored in CDS motif qualifiers """
+    for qual in ["leader_location", "tail_location"]:
+        if qual not in feature.qualifiers:
+            continue
+        loc = location_from_string(feature.qualifiers[qual][0])
+        parts = []
+        for part in loc.parts:
+            new_start = part.start + offsets["location"]
+            new_end = part.end + offsets["location"]
+            parts.append(FeatureLocation(new_start, new_end, part.strand))
+        feature.qualifiers[qual] = [str(build_location_from_others(parts))]
+
+
+# the functions to update a feature's qualifiers when extracted into a region's genbank file,
+# keyed by feature type
+_GENBANK_UPDATERS: Dict[str, Callable[[SeqFeature, Dict[str, int]], None]] = {
+    "region": _renumber_region,
+    CandidateCluster.FEATURE_TYPE: _renumber_candidate_cluster,
+    Protocluster.FEATURE_TYPE: _renumber_protocluster,
+    "proto_core": _renumber_protocluster,
+    SubRegion.FEATURE_TYPE: _renumber_subregion,
+    "CDS_motif": _relocate_motif_components,
+}
+
+
 class Region(CDSCollection):
     """ A feature that represents a region of interest made up of overlapping
         CandidateCluster features and/or SubRegion features.
@@ -36,7 +89,8 @@ class Region(CDSCollection):
         Region features cannot overlap.
     """
     __slots__ = ["_subregions", "_candidate_clusters", "clusterblast",
-                 "knownclusterblast", "subclusterblast"]
+                 "knownclusterblast", "subclusterblast", "_products", "_detection_rules",
+                 "_unique_protoclusters"]
     FEATURE_TYPE = "region"
 
     def __init__(self, candidate_clusters: List[CandidateCluster] = None,
@@ -61,8 +115,13 @@ class Region(CDSCollection):
         location = combine_locations(child.location for child in children)
 
         super().__init__(location, feature_type=self.FEATURE_TYPE, child_collections=children)
-        self._subregions = subregions
-        self._candidate_clusters = candidate_clusters
+        # stored as tuples, since the children of a region cannot change
+        self._subregions = tuple(subregions)
+        self._candidate_clusters = tuple(candidate_clusters)
+        # both built together on first use, since child clusters cannot change
+        self._products: Optional[Tuple[str, ...]] = None
+        self._detection_rules: Optional[Tuple[str, ...]] = None
+        self._unique_protoclusters: Optional[Tuple[Protocluster, ...]] = None
 
         self.clusterblast: Optional[List[str]] = None
         self.knownclusterblast: Any = None
@@ -70,26 +129,40 @@ class Region(CDSCollection):
 
     @property
     def subregions(self) -> Tuple[SubRegion, ...]:
-        """ Returns a list of SubRegion features used to create this region
+        """ Returns a tuple of SubRegion features used to create this region
         """
-        return tuple(self._subregions)
+        return self._subregions
 
     @property
     def candidate_clusters(self) -> Tuple[CandidateCluster, ...]:
-        """ Returns a list of CandidateCluster features used to create this region
+        """ Returns a tuple of CandidateCluster features used to create this region
         """
-        return tuple(self._candidate_clusters)
+        return self._candidate_clusters
+
+    def _build_products_and_rules(self) -> None:
+        """ Collects the unique products and their detection rules from all
+            contained CandidateClusters in a single pass
+        """
+        products: Dict[str, None] = OrderedDict()
+        rules: Dict[str, str] = OrderedDict()
+        for cluster in self._candidate_clusters:
+            cluster_products = cluster.products
+            for product in cluster_products:
+                products[product] = None
+            for product, rule in zip(cluster_products, cluster.detection_rules):
+                rules[product] = rule
+        self._products = tuple(products) or ("unknown",)
+        self._detection_rules = tuple(rules.values())
 
     @property
     def products(self) -> List[str]:
         """ Returns a list of unique products collected from all contained
             CandidateClusters
         """
-        products: Dict[str, None] = OrderedDict()
-        for cluster in self._candidate_clusters:
-            for product in cluster.products:
-                products[product] = None
-        return list(products) or ["unknown"]
+        if self._products is None:
+            self._build_products_and_rules()
+        assert self._products is not None
+        return list(self._products)
 
     def get_product_string(self) -> str:
         """ Returns a string of all unique products collected from all
@@ -102,11 +175,10 @@ class Region(CDSCollection):
         """ Returns a list of unique detection rules collected from all
             contained CandidateClusters
         """
-        rules: Dict[str, str] = OrderedDict()
-        for cluster in self._candidate_clusters:
-            for product, rule in zip(cluster.products, cluster.detection_rules):
-                rules[product] = rule
-        return list(rules.values())
+        if self._detection_rules is None:
+            self._build_products_and_rules()
+        assert self._detection_rules is not None
+        return list(self._detection_rules)
 
     def add_cds(self, cds: CDSFeature) -> None:
         """ Adds a CDS to the Region and all relevant child collections. Links
@@ -130,10 +202,11 @@ class Region(CDSCollection):
 
             Result is sorted by location start, then by decreasing size, then by product
         """
-        clusters: Set[Protocluster] = set()
-        for candidate_cluster in self._candidate_clusters:
-            clusters.update(candidate_cluster.protoclusters)
-        return sorted(clusters, key=lambda x: (x.location.start, -len(x.location), x.product))
+        if self._unique_protoclusters is None:
+            clusters = {proto for candidate in self._candidate_clusters for proto in candidate.protoclusters}
+            ordered = sorted(clusters, key=lambda x: (x.location.start, -len(x.location), x.product))
+            self._unique_protoclusters = tuple(ordered)
+        return list(self._unique_protoclusters)
 
     def get_sideloaded_areas(self) -> List[Union[SideloadedProtocluster, SideloadedSubRegion]]:
         """ Returns all protoclusters and subregions that were created by
@@ -192,42 +265,27 @@ class Region(CDSCollection):
 
         # renumber clusters, candidate_clusters and regions to reflect changes
         # also update positions of RiPP component locations
-        if self.candidate_clusters:
-            first_candidate_cluster = min(sc.get_candidate_cluster_number() for sc in self.candidate_clusters)
-            first_cluster = min(cluster.get_protocluster_number() for cluster in self.get_unique_protoclusters())
+        # offsets are calculated once, so that each renumbering is a single addition
+        if self._candidate_clusters:
+            candidate_offset = 1 - min(sc.get_candidate_cluster_number() for sc in self._candidate_clusters)
+            cluster_offset = 1 - min(cluster.get_protocluster_number() for cluster in self.get_unique_protoclusters())
+        else:
+            candidate_offset = 1
+            cluster_offset = 1
+        if self._subregions:
+            subregion_offset = 1 - min(sub.get_subregion_number() for sub in self._subregions)
         else:
-            first_candidate_cluster = 0
-            first_cluster = 0
-        first_subregion = min(sub.get_subregion_number() for sub in self.subregions) if self.subregions else 0
+            subregion_offset = 1
+        offsets = {
+            "candidate": candidate_offset,
+            "protocluster": cluster_offset,
+            "subregion": subregion_offset,
+            "location": -self.location.start,
+        }
         for feature in cluster_record.features:
-            if feature.type == Region.FEATURE_TYPE:
-                candidates = feature.qualifiers.get("candidate_cluster_numbers")
-                if not candidates:
-                    continue
-                candidates = [str(int(num) - first_candidate_cluster + 1) for num in candidates]
-                feature.qualifiers["candidate_cluster_numbers"] = candidates
-            elif feature.type == CandidateCluster.FEATURE_TYPE:
-                new = str(int(feature.qualifiers["candidate_cluster_number"][0]) - first_candidate_cluster + 1)
-                feature.qualifiers["candidate_cluster_number"] = [new]
-                new_clusters = [str(int(num) - first_cluster + 1) for num in feature.qualifiers["protoclusters"]]
-                feature.qualifiers["protoclusters"] = new_clusters
-            elif feature.type in ["protocluster", "proto_core"]:
-                new = str(int(feature.qualifiers["protocluster_number"][0]) - first_cluster + 1)
-                feature.qualifiers["protocluster_number"] = [new]
-            elif feature.type == "subregion":
-                new = str(int(feature.qualifiers["subregion_number"][0]) - first_subregion + 1)
-                feature.qualifiers["subregion_number"] = [new]
-            elif feature.type == "CDS_motif":
-                for qual in ["leader_location", "tail_location"]:
-                    if qual not in feature.qualifiers:
-                        continue
-                    loc = location_from_string(feature.qualifiers[qual][0])
-                    parts = []
-                    for part in loc.parts:
-                        new_start = part.start - self.location.start
-                        new_end = part.end - self.location.start
-                        parts.append(FeatureLocation(new_start, new_end, part.strand))
-                    feature.qualifiers[qual] = [str(build_location_from_others(parts))]
+            updater = _GENBANK_UPDATERS.get(feature.type)
+            if updater:
+                updater(feature, offsets)
 
         seqio.write([cluster_record], filename, 'genbank')
 
@@ -127,6 +127,14 @@ class TestRegion(unittest.TestCase):
         assert region.products == ["b", "a"]
         assert region.get_product_string() == "a,b"
 
+    def test_children_fixed(self):
+        candidates = [DummyCandidateCluster([create_protocluster(0, 10)])]
+        region = Region(candidate_clusters=candidates)
+        assert region.candidate_clusters is region.candidate_clusters
+        candidates.append(DummyCandidateCluster([create_protocluster(20, 30)]))
+        assert len(region.candidate_clusters) == 1
+        assert region.subregions == ()
+
     def test_genbank(self):
         dummy_record = Record(Seq("A"*100))
         clusters = [create_protocluster(3, 20, "prodA"),
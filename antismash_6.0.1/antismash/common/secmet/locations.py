@@ -3,7 +3,12 @@
 
 """ Helper functions for location operations """
 
+from bisect import bisect_right
+from collections import Counter
+from itertools import islice
 import logging
+from operator import attrgetter
+import re
 from typing import Iterable, List, Optional, Sequence, Tuple, Union
 
 from Bio.SeqFeature import (
@@ -47,7 +52,7 @@ def convert_protein_position_to_dna(start: int, end: int, location: Location) ->
                               "out of bounds for location %s") % (dna_start, dna_end, location))
         return dna_start, dna_end
 
-    parts = sorted(location.parts, key=lambda x: x.start)
+    parts = sorted(location.parts, key=attrgetter("start"))
     gap = 0
     last_end = parts[0].start
     start_found = False
@@ -55,15 +60,17 @@ def convert_protein_position_to_dna(start: int, end: int, location: Location) ->
     for part in parts:
         if start_found and end_found:
             break
-        gap += part.start - last_end
-        if not start_found and dna_start + gap in part:
+        part_start = part.start
+        part_end = part.end
+        gap += part_start - last_end
+        if not start_found and part_start <= dna_start + gap < part_end:
             start_found = True
             dna_start = dna_start + gap
-        if not end_found and dna_end + gap - 1 in part:
+        if not end_found and part_start <= dna_end + gap - 1 < part_end:
             end_found = True
             dna_end = dna_end + gap
 
-        last_end = part.end
+        last_end = part_end
 
     assert start_found
     assert end_found
@@ -88,17 +95,32 @@ def build_location_from_others(locations: Sequence[Location]) -> FeatureLocation
     """
     if not locations:
         raise ValueError("at least one FeatureLocation required")
-    location = locations[0]
+    if len(locations) == 1:
+        return locations[0]
+
+    # accumulate a single list of parts instead of building intermediate locations,
+    # tracking the end and strand counts that the intermediates would have had
+    parts = list(locations[0].parts)
+    end = locations[0].end
+    strand_counts = Counter(part.strand for part in parts)
     for loc in locations[1:]:
-        if loc.start == location.end:
-            new_sub = FeatureLocation(location.parts[-1].start, loc.parts[0].end, location.strand)
-            if len(location.parts) > 1 or len(loc.parts) > 1:
-                location = CompoundLocation(location.parts[:-1] + [new_sub] + loc.parts[1:])
-            else:
-                location = new_sub
-        else:
-            location = CompoundLocation(location.parts + loc.parts)
-    return location
+        new_parts = loc.parts
+        if loc.start == end:
+            strand = next(iter(strand_counts)) if len(strand_counts) == 1 else None
+            trailing = parts.pop()
+            strand_counts[trailing.strand] -= 1
+            if not strand_counts[trailing.strand]:
+                del strand_counts[trailing.strand]
+            parts.append(FeatureLocation(trailing.start, new_parts[0].end, strand))
+            strand_counts[strand] += 1
+            new_parts = new_parts[1:]
+        parts.extend(new_parts)
+        strand_counts.update(part.strand for part in new_parts)
+        end = max(end, loc.end)
+
+    if len(parts) == 1:
+        return parts[0]
+    return CompoundLocation(parts)
 
 
 def location_bridges_origin(location: Location, allow_reversing: bool = False) -> bool:
@@ -123,15 +145,10 @@ def location_bridges_origin(location: Location, allow_reversing: bool = False) -
 
     def check(location: Location) -> bool:
         """ Returns True if the exon ordering is invalid for the strand """
-        for i, part in enumerate(location.parts[1:]):
-            prev = location.parts[i]
-            if location.strand == 1:
-                if prev.start > part.start:
-                    return True
-            else:
-                if prev.start < part.start:
-                    return True
-        return False
+        parts = location.parts
+        if location.strand == 1:
+            return any(prev.start > part.start for prev, part in zip(parts, parts[1:]))
+        return any(prev.start < part.start for prev, part in zip(parts, parts[1:]))
 
     if check(location):
         # due to annotations having two alternate orders for reverse strand parts:
@@ -162,8 +179,10 @@ def _is_valid_split(lower: List[Location], upper: List[Location], strand: int) -
 
     # check that all components in each section are correctly ordered
     for section in [upper, lower]:
-        starts = [part.start for part in section]
-        if sorted(starts, reverse=(strand == -1)) != starts:
+        if strand == -1:
+            if any(prev.start < part.start for prev, part in zip(section, section[1:])):
+                return False
+        elif any(prev.start > part.start for prev, part in zip(section, section[1:])):
             return False
     return True
 
@@ -180,25 +199,24 @@ def split_origin_bridging_location(location: CompoundLocation) -> Tuple[
         Returns:
             a tuple of lists, each list containing one or more FeatureLocations
     """
-    lower: List[FeatureLocation] = []
-    upper: List[FeatureLocation] = []
-    if location.strand == 1:
-        for i, part in enumerate(location.parts):
-            if not upper or part.start > upper[-1].start:
-                upper.append(part)
-            else:
-                lower.extend(location.parts[i:])
-                break
-    elif location.strand == -1:
-        for i, part in enumerate(location.parts):
-            if not lower or part.start < lower[-1].start:
-                lower.append(part)
-            else:
-                upper.extend(location.parts[i:])
-                break
-    else:
+    strand = location.strand
+    if strand not in [1, -1]:
         raise ValueError("Cannot separate bridged location without a valid strand")
 
+    # find the end of the leading run of parts that are ordered correctly for the strand
+    parts = location.parts
+    split = len(parts)
+    for i in range(1, len(parts)):
+        if (parts[i].start - parts[i - 1].start) * strand <= 0:
+            split = i
+            break
+
+    # the leading run is at the high end for the forward strand and the low end for the reverse
+    if strand == 1:
+        upper, lower = parts[:split], parts[split:]
+    else:
+        lower, upper = parts[:split], parts[split:]
+
     if not (lower and upper):
         raise ValueError("Location does not bridge origin: %s" % location)
 
@@ -218,12 +236,19 @@ def locations_overlap(first: Location, second: Location) -> bool:
         Returns:
             True if the locations overlap, otherwise False
     """
-    if isinstance(first, CompoundLocation):
-        return any(locations_overlap(part, second) for part in first.parts)
-    if isinstance(second, CompoundLocation):
-        return any(locations_overlap(first, part) for part in second.parts)
-    return (first.start in second or first.end - 1 in second
-            or second.start in first or second.end - 1 in first)
+    # compare the bounds of each pair of parts directly, instead of recursing
+    # through compound locations and using location membership checks
+    second_bounds = sorted((part.start, part.end) for part in second.parts)
+    second_starts = [start for start, _ in second_bounds]
+    for part in first.parts:
+        first_start = part.start
+        first_end = part.end
+        # parts of the second location starting beyond the end of this part can't overlap it
+        for second_start, second_end in islice(second_bounds, bisect_right(second_starts, first_end)):
+            if (second_start <= first_start < second_end or second_start <= first_end - 1 < second_end
+                    or first_start <= second_start < first_end or first_start <= second_end - 1 < first_end):
+                return True
+    return False
 
 
 def location_contains_other(outer: Location, inner: Location) -> bool:
@@ -237,6 +262,11 @@ def location_contains_other(outer: Location, inner: Location) -> bool:
         Returns:
             True if outer contains inner, otherwise False
     """
+    # the simple case is by far the most common, so compare bounds directly
+    if type(inner) is FeatureLocation and type(outer) is FeatureLocation:  # pylint: disable=unidiomatic-typecheck
+        outer_start = outer.start
+        outer_end = outer.end
+        return outer_start <= inner.start < outer_end and outer_start <= inner.end - 1 < outer_end
     if isinstance(inner, CompoundLocation):
         return all(location_contains_other(outer, part) for part in inner.parts)
     if isinstance(outer, CompoundLocation):
@@ -244,48 +274,53 @@ def location_contains_other(outer: Location, inner: Location) -> bool:
     return inner.start in outer and inner.end - 1 in outer
 
 
+# e.g. [<1:6](-), with the strand section being optional
+_SINGLE_LOCATION_PATTERN = re.compile(
+    r"\[(?:([<>]?)(-?\d+)|UnknownPosition\(\)):(?:([<>]?)(-?\d+)|UnknownPosition\(\))\](?:\((.)\))?"
+)
+_POSITION_TYPES = {"": ExactPosition, "<": BeforePosition, ">": AfterPosition}
+_STRANDS = {"+": 1, "-": -1, "?": 0}
+
+
+def _parse_single_location(string: str) -> FeatureLocation:
+    """ Converts a single location from a string to a FeatureLocation """
+    match = _SINGLE_LOCATION_PATTERN.fullmatch(string)
+    if not match:
+        raise ValueError("Cannot parse location: %s" % string)
+    start_fuzziness, start, end_fuzziness, end, strand_text = match.groups()
+
+    if strand_text is None:
+        strand: Optional[int] = None
+    elif strand_text in _STRANDS:
+        strand = _STRANDS[strand_text]
+    else:
+        raise ValueError("Cannot identify strand in location: %s" % string)
+
+    return FeatureLocation(_build_position(start_fuzziness, start),
+                           _build_position(end_fuzziness, end), strand=strand)
+
+
+def _build_position(fuzziness: Optional[str], value: Optional[str]) -> AbstractPosition:
+    """ Converts the parsed components of a position into a Position subclass """
+    if value is None:
+        return UnknownPosition()
+    assert fuzziness is not None
+    return _POSITION_TYPES[fuzziness](int(value))
+
+
 def location_from_string(data: str) -> Location:
     """ Converts a string, e.g. [<1:6](-), to a FeatureLocation or CompoundLocation
     """
-    def parse_position(string: str) -> AbstractPosition:
-        """ Converts a positiong from a string into a Position subclass """
-        if string[0] == '<':
-            return BeforePosition(int(string[1:]))
-        if string[0] == '>':
-            return AfterPosition(int(string[1:]))
-        if string == "UnknownPosition()":
-            return UnknownPosition()
-        return ExactPosition(int(string))
-
-    def parse_single_location(string: str) -> FeatureLocation:
-        """ Converts a single location from a string to a FeatureLocation """
-        start = parse_position(string[1:].split(':', 1)[0])  # [<1:6](-) -> <1
-        end = parse_position(string.split(':', 1)[1].split(']', 1)[0])  # [<1:6](-) -> 6
-
-        strand_text = string[-2]  # [<1:6](-) -> -
-        if strand_text == '-':
-            strand: Optional[int] = -1
-        elif strand_text == '+':
-            strand = 1
-        elif strand_text == '?':
-            strand = 0
-        elif '(' not in string:
-            strand = None
-        else:
-            raise ValueError("Cannot identify strand in location: %s" % string)
-
-        return FeatureLocation(start, end, strand=strand)
-
     assert isinstance(data, str), "%s, %r" % (type(data), data)
 
     if '{' not in data:
-        return parse_single_location(data)
+        return _parse_single_location(data)
 
     # otherwise it's a compound location
     # join{[1:6](+), [10:16](+)} -> ("join", "[1:6](+), [10:16](+)")
     operator, combined_location = data[:-1].split('{', 1)
 
-    locations = [parse_single_location(part) for part in combined_location.split(', ')]
+    locations = [_parse_single_location(part) for part in combined_location.split(', ')]
     return CompoundLocation(locations, operator=operator)
 
 
@@ -335,7 +370,8 @@ def location_contains_overlapping_exons(location: Location) -> bool:
     if not isinstance(location, CompoundLocation):
         raise TypeError("expected CompoundLocation, not %s" % type(location))
 
-    return len(set(part.end for part in location.parts)) != len(location.parts)
+    parts = location.parts
+    return len({part.end for part in parts}) != len(parts)
 
 
 def ensure_valid_locations(features: List[SeqFeature], can_be_circular: bool, sequence_length: int) -> None:
@@ -357,27 +393,31 @@ def ensure_valid_locations(features: List[SeqFeature], can_be_circular: bool, se
         Returns:
             None
     """
+    # non-circular records with compound locations need to have the right part ordering
+    # for translations, only really relevant for reverse strand features
+    # so find what pattern has been used for locations while checking validity
+    standard = 0
+    non_standard = 0
+    stranded: List[Location] = []
     for feature in features:
+        location = feature.location
         # biopython drops invalid locations, so catch that first
-        if feature.location is None:
+        if location is None:
             raise ValueError("one or more features with missing or invalid locations")
         # features outside the sequence cause problems with motifs and translations
-        if feature.location.end > sequence_length:
-            raise ValueError("feature outside record sequence: %s" % feature.location)
+        if location.end > sequence_length:
+            raise ValueError("feature outside record sequence: %s" % location)
         # features with overlapping exons cause translation problems
-        if location_contains_overlapping_exons(feature.location):
-            raise ValueError("location contains overlapping exons: %s" % feature.location)
+        if location_contains_overlapping_exons(location):
+            raise ValueError("location contains overlapping exons: %s" % location)
 
-    # non-circular records with compound locations need to have the right part ordering
-    # for translations, only really relevant for reverse strand features
-    # first find what pattern has been used for locations
-    standard = 0
-    non_standard = 0
-    for feature in features:
-        if not feature.location.strand or feature.type not in ["CDS", "gene"]:
+        if not location.strand:
+            continue
+        stranded.append(location)
+        if feature.type not in ["CDS", "gene"]:
             continue
 
-        if location_bridges_origin(feature.location):
+        if location_bridges_origin(location):
             non_standard += 1
         else:
             standard += 1
@@ -391,8 +431,6 @@ def ensure_valid_locations(features: List[SeqFeature], can_be_circular: bool, se
         raise ValueError("inconsistent exon ordering for features in non-circular record")
 
     if non_standard:
-        for feature in features:
-            if not feature.location.strand:
-                continue
-            if location_bridges_origin(feature.location, allow_reversing=True):
-                raise ValueError("cannot determine correct exon ordering for location: %s" % feature.location)
+        for location in stranded:
+            if location_bridges_origin(location, allow_reversing=True):
+                raise ValueError("cannot determine correct exon ordering for location: %s" % location)
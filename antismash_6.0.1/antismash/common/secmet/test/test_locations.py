@@ -309,6 +309,17 @@ class TestLocationSerialiser(unittest.TestCase):
 
         return new_location
 
+    def test_unparseable(self):
+        for bad in ["[1:6", "[a:6](+)", "1:6(+)", "[1:6](+) "]:
+            with self.assertRaisesRegex(ValueError, "Cannot parse location"):
+                location_from_string(bad)
+        with self.assertRaisesRegex(ValueError, "Cannot identify strand"):
+            location_from_string("[1:6](x)")
+
+    def test_no_strand(self):
+        assert location_from_string("[1:6]").strand is None
+        assert location_from_string("[1:6](?)").strand == 0
+
     def test_before_position(self):
         location = FeatureLocation(BeforePosition(1), ExactPosition(6), strand=-1)
         new_location = self.convert(location)
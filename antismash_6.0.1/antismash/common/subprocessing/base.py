@@ -20,6 +20,9 @@ with warnings.catch_warnings():
     warnings.simplefilter("ignore")
     from Bio import SearchIO  # for import by others without wrapping, pylint: disable=unused-import
 
+# below this many jobs, running them in process is cheaper than starting a pool
+MIN_PARALLEL_JOBS = 4
+
 
 class RunResult:
     """ A container for simplifying the results of running a command """
@@ -50,7 +53,7 @@ class RunResult:
         return " ".join(self.command)
 
 
-def execute(commands: List[str], stdin: Optional[str] = None, stdout: Union[int, IO[Any], None] = PIPE,
+def execute(commands: List[str], stdin: Union[str, bytes, None] = None, stdout: Union[int, IO[Any], None] = PIPE,
             stderr: Union[int, IO[Any], None] = PIPE, timeout: int = None) -> RunResult:
     """ Executes commands in a system-independent manner via a child process.
 
@@ -59,7 +62,8 @@ def execute(commands: List[str], stdin: Optional[str] = None, stdout: Union[int,
 
         Arguments:
             commands: a list of arguments to execute
-            stdin: None or input to be piped into the child process
+            stdin: None or input to be piped into the child process, text
+                   will be encoded as UTF-8 and bytes will be piped as is
             stdout: if a file is provided, stdout from the child process
                     will be piped to that file instead of the parent process
             stderr: if a file is provided, stderr from the child process
@@ -77,7 +81,7 @@ def execute(commands: List[str], stdin: Optional[str] = None, stdout: Union[int,
 
     if stdin is not None:
         stdin_redir: Optional[int] = PIPE
-        input_bytes: Optional[bytes] = stdin.encode("utf-8")
+        input_bytes: Optional[bytes] = stdin if isinstance(stdin, bytes) else stdin.encode("utf-8")
     else:
         stdin_redir = None
         input_bytes = None
@@ -140,6 +144,23 @@ def parallel_function(function: Callable, args: Iterable[List[Any]],
     return results
 
 
+def parallel_function_for_jobs(function: Callable, args: List[List[Any]],
+                               min_jobs: int = MIN_PARALLEL_JOBS) -> list:
+    """ Runs the given function for each set of arguments, only using multiple
+        processes when there are enough jobs to outweigh the cost of starting them.
+
+        Arguments:
+            function: the function to run, cannot be a lambda
+            args: a list of lists, containing the arguments for each function call
+            min_jobs: the smallest number of jobs to run in parallel
+
+        Returns:
+            A list of return values of the target function, in the same order as args.
+    """
+    cpus = 1 if len(args) < min_jobs else None
+    return parallel_function(function, args, cpus=cpus)
+
+
 def child_process(command: List[str]) -> int:
     """ Called by multiprocessing's map or map_async method, cannot be locally
         defined """
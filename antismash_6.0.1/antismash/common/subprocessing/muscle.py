@@ -7,7 +7,7 @@
 from tempfile import NamedTemporaryFile
 from typing import Dict
 
-from antismash.common.fasta import read_fasta, write_fasta
+from antismash.common.fasta import parse_fasta, write_fasta
 
 from .base import execute, get_config
 
@@ -25,20 +25,18 @@ def run_muscle_single(seq_name: str, seq: str, comparison_file: str) -> Dict[str
             a dictionary mapping sequence name (query or reference) to alignment
     """
     with NamedTemporaryFile(mode="w+") as temp_in:
-        with NamedTemporaryFile(mode="w+") as temp_out:
-            write_fasta([seq_name], [seq], temp_in.name)
-            # Run muscle and collect sequence positions from file
-            result = execute([get_config().executables.muscle,
-                              "-profile", "-quiet",
-                              "-in1", comparison_file,
-                              "-in2", temp_in.name,
-                              "-out", temp_out.name])
-            if not result.successful():
-                raise RuntimeError("muscle returned %d: %r while comparing query named %s" % (
-                                   result.return_code, result.stderr.replace("\n", ""),
-                                   seq_name))
-            fasta = read_fasta(temp_out.name)
-    return fasta
+        write_fasta([seq_name], [seq], temp_in.name)
+        # Run muscle and collect sequence positions from its output,
+        # which is written to stdout when no output file is given
+        result = execute([get_config().executables.muscle,
+                          "-profile", "-quiet",
+                          "-in1", comparison_file,
+                          "-in2", temp_in.name])
+    if not result.successful():
+        raise RuntimeError("muscle returned %d: %r while comparing query named %s" % (
+                           result.return_code, result.stderr.replace("\n", ""),
+                           seq_name))
+    return parse_fasta(result.stdout)
 
 
 def run_muscle_version() -> str:
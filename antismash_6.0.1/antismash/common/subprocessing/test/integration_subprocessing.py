@@ -113,6 +113,10 @@ class TestExecute(unittest.TestCase):
         assert not result.stderr
         assert not result.return_code and result.successful()
 
+        result = subprocessing.execute(["cat"], stdin=b"fish")
+        assert result.stdout.strip() == "fish"
+        assert not result.return_code and result.successful()
+
     def test_redirection(self):
         result = subprocessing.execute(["echo", "test"], stdout=open(os.devnull, "w"))
         with self.assertRaisesRegex(ValueError, "stdout was redirected to file, unable to access"):
@@ -0,0 +1,24 @@
+# License: GNU Affero General Public License v3 or later
+# A copy of GNU AGPL v3 should have been included in this software package in LICENSE.txt.
+
+# for test files, silence irrelevant and noisy pylint warnings
+# pylint: disable=no-self-use,protected-access,missing-docstring
+
+import unittest
+from unittest.mock import patch
+
+from antismash.common.subprocessing import base
+
+
+class TestParallelFunctionForJobs(unittest.TestCase):
+    def test_few_jobs_in_process(self):
+        with patch.object(base, "parallel_function", return_value=[]) as patched:
+            base.parallel_function_for_jobs(len, [["a"]] * (base.MIN_PARALLEL_JOBS - 1))
+            assert patched.call_args[1]["cpus"] == 1
+            base.parallel_function_for_jobs(len, [["a"]] * base.MIN_PARALLEL_JOBS)
+            assert patched.call_args[1]["cpus"] is None
+
+    def test_custom_minimum(self):
+        with patch.object(base, "parallel_function", return_value=[]) as patched:
+            base.parallel_function_for_jobs(len, [["a"]] * 2, min_jobs=2)
+            assert patched.call_args[1]["cpus"] is None
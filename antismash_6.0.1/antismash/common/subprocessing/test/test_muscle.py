@@ -0,0 +1,38 @@
+# License: GNU Affero General Public License v3 or later
+# A copy of GNU AGPL v3 should have been included in this software package in LICENSE.txt.
+
+# for test files, silence irrelevant and noisy pylint warnings
+# pylint: disable=no-self-use,protected-access,missing-docstring
+
+import unittest
+from unittest.mock import patch
+
+from antismash.common import subprocessing
+from antismash.common.subprocessing import muscle
+from antismash.config import build_config, destroy_config
+
+
+class TestMuscleSingle(unittest.TestCase):
+    def setUp(self):
+        self.config = build_config([])
+        self.config.executables.muscle = "muscle"
+
+    def tearDown(self):
+        destroy_config()
+
+    def test_output_from_stdout(self):
+        def fake_execute(command, **_kwargs):
+            assert "-out" not in command
+            with open(command[command.index("-in2") + 1]) as handle:
+                assert handle.read() == ">query\nMAGIC\n"
+            return subprocessing.RunResult(command, b">ref\nMA-GIC\n>query\nMA-GIC\n", b"", 0, True, True)
+
+        with patch.object(muscle, "execute", side_effect=fake_execute):
+            result = subprocessing.run_muscle_single("query", "MAGIC", "ref.fasta")
+        assert result == {"ref": "MA-GIC", "query": "MA-GIC"}
+
+    def test_failure(self):
+        result = subprocessing.RunResult(["muscle"], b"", b"bad\ninput", 1, True, True)
+        with patch.object(muscle, "execute", return_value=result):
+            with self.assertRaisesRegex(RuntimeError, "muscle returned 1: 'badinput'"):
+                subprocessing.run_muscle_single("query", "MAGIC", "ref.fasta")
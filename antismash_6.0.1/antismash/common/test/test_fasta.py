@@ -0,0 +1,114 @@
+# License: GNU Affero General Public License v3 or later
+# A copy of GNU AGPL v3 should have been included in this software package in LICENSE.txt.
+
+# for test files, silence irrelevant and noisy pylint warnings
+# pylint: disable=no-self-use,protected-access,missing-docstring
+
+from io import StringIO
+from tempfile import NamedTemporaryFile
+import unittest
+
+from antismash.common import fasta
+from antismash.common.test.helpers import DummyCDS
+
+
+class TestFeatureFasta(unittest.TestCase):
+    def setUp(self):
+        self.cdses = [DummyCDS(locus_tag="A", translation="MAGIC"),
+                      DummyCDS(locus_tag="B", translation="HAT")]
+
+    def test_get_fasta(self):
+        assert fasta.get_fasta_from_features(self.cdses) == ">A\nMAGIC\n>B\nHAT"
+        assert fasta.get_fasta_from_features(self.cdses, numeric_names=True) == ">0\nMAGIC\n>1\nHAT"
+
+    def test_get_fasta_empty(self):
+        assert fasta.get_fasta_from_features([]) == ""
+
+    def test_write_to_handle(self):
+        handle = StringIO()
+        fasta.write_fasta_from_features(self.cdses, handle)
+        assert handle.getvalue() == ">A\nMAGIC\n>B\nHAT\n"
+
+        handle = StringIO()
+        fasta.write_fasta_from_features(iter(self.cdses), handle, numeric_names=True)
+        assert handle.getvalue() == ">0\nMAGIC\n>1\nHAT\n"
+
+
+class TestWriteFasta(unittest.TestCase):
+    def test_round_trip(self):
+        with NamedTemporaryFile("r") as handle:
+            fasta.write_fasta(["a", "b"], ["MAGIC", "HAT"], handle.name)
+            assert handle.read() == ">a\nMAGIC\n>b\nHAT\n"
+            assert fasta.read_fasta(handle.name) == {"a": "MAGIC", "b": "HAT"}
+
+    def test_mismatched_lengths(self):
+        # extra names or sequences are ignored
+        with NamedTemporaryFile("r") as handle:
+            fasta.write_fasta(["a", "b"], ["MAGIC"], handle.name)
+            assert handle.read() == ">a\nMAGIC\n"
+
+
+class TestReadFasta(unittest.TestCase):
+    def read(self, text):
+        with NamedTemporaryFile("w+") as handle:
+            handle.write(text)
+            handle.flush()
+            return fasta.read_fasta(handle.name)
+
+    def test_simple(self):
+        result = self.read(">a b\nMAG\nIC\n\n>c\r\nHA-T\r\n")
+        assert list(result.items()) == [("a_b", "MAGIC"), ("c", "HA-T")]
+
+    def test_header_whitespace(self):
+        # only trailing whitespace is removed from identifiers
+        assert self.read("> a b \nMAGIC\n") == {"_a_b": "MAGIC"}
+
+    def test_indented_lines(self):
+        assert self.read("  >a\n  MAG \n\tIC\n") == {"a": "MAGIC"}
+
+    def test_carriage_returns(self):
+        assert self.read(">a\rMAG\rIC\r>b\rHAT") == {"a": "MAGIC", "b": "HAT"}
+
+    def test_whitespace_within_sequence(self):
+        with self.assertRaisesRegex(ValueError, "non-alphabetic"):
+            self.read(">a\nMA G\n")
+
+    def test_leading_blank_lines(self):
+        assert self.read("\n\n>a\nMAGIC") == {"a": "MAGIC"}
+
+    def test_sequence_before_id(self):
+        with self.assertRaisesRegex(ValueError, "Sequence before identifier"):
+            self.read("MAGIC\n>a\nHAT\n")
+
+    def test_bad_characters(self):
+        with self.assertRaisesRegex(ValueError, "non-alphabetic"):
+            self.read(">a\nMAG1C\n")
+
+    def test_non_ascii_letters(self):
+        assert self.read(">a\nMAGÉ\n") == {"a": "MAGÉ"}
+        # including whitespace around lines
+        assert self.read(">a b\u00a0\nMA\u00a0\nGIC\n") == {"a_b": "MAGIC"}
+        with self.assertRaisesRegex(ValueError, "non-alphabetic"):
+            self.read(">a\nMAG€\n")
+
+    def test_missing_sequence(self):
+        with self.assertRaisesRegex(ValueError, "different counts"):
+            self.read(">a\n>b\nMAGIC\n")
+
+    def test_empty(self):
+        with self.assertRaisesRegex(ValueError, "no sequences"):
+            self.read("\n")
+
+
+class TestParseFasta(unittest.TestCase):
+    def test_simple(self):
+        result = fasta.parse_fasta(">a\nMAG\nIC\n>b c\nHAT\n")
+        assert list(result.items()) == [("a", "MAGIC"), ("b_c", "HAT")]
+
+    def test_empty(self):
+        with self.assertRaisesRegex(ValueError, "no sequences"):
+            fasta.parse_fasta("")
+
+    def test_missing_sequence(self):
+        with self.assertRaisesRegex(ValueError, "different counts"):
+            fasta.parse_fasta(">a\n>b\nMAGIC\n")
@@ -5,7 +5,8 @@
 # pylint: disable=no-self-use,protected-access,missing-docstring
 
 from unittest import TestCase
-from Bio.SeqFeature import CompoundLocation, SeqFeature
+from unittest.mock import patch
+from Bio.SeqFeature import CompoundLocation, FeatureLocation, SeqFeature
 from Bio.SeqRecord import SeqRecord
 
 from antismash.common import errors, gff_parser, path
@@ -54,3 +55,44 @@ class GffParserTest(TestCase):
         # test force correlation
         self.sequences = self.sequences[1:]  # CONTIG_2
         gff_parser.check_gff_suitability(self.gff_file, self.sequences)
+
+
+class TestSubfeatureDetails(TestCase):
+    def check_padding(self, start, end, strand, expected):
+        sub = SeqFeature(FeatureLocation(start, end, strand), type="CDS")
+        locations = []
+        trans_locations = []
+        gff_parser.generate_details_from_subfeature(sub, {}, locations, trans_locations)
+        assert locations == [FeatureLocation(start, end, strand)]
+        assert trans_locations == [FeatureLocation(*expected, strand)]
+
+    def test_codon_padding(self):
+        self.check_padding(0, 9, 1, (0, 9))
+        self.check_padding(0, 10, 1, (0, 12))
+        self.check_padding(0, 11, 1, (0, 12))
+        self.check_padding(5, 9, -1, (3, 9))
+        self.check_padding(4, 9, -1, (3, 9))
+        self.check_padding(3, 9, -1, (3, 9))
+
+
+class TestCheckSub(TestCase):
+    def build(self, start, end, strand=1, feature_type="CDS", subs=None, **qualifiers):
+        feature = SeqFeature(FeatureLocation(start, end, strand), type=feature_type,
+                             qualifiers={key: [value] for key, value in qualifiers.items()})
+        feature.sub_features = subs or []
+        return feature
+
+    def test_nested_features_preferred(self):
+        inner = self.build(0, 30, feature_type="mRNA", subs=[self.build(0, 9), self.build(15, 30)])
+        outer = self.build(0, 60, feature_type="gene", subs=[inner, self.build(40, 60)])
+        features = gff_parser.check_sub(outer)
+        assert len(features) == 1
+        assert features[0].location == CompoundLocation([FeatureLocation(0, 9, 1), FeatureLocation(15, 30, 1)])
+
+    def test_invalid_part_beside_nested(self):
+        inner = self.build(0, 30, feature_type="mRNA", subs=[self.build(0, 9)])
+        outer = self.build(0, 60, strand=-1, feature_type="gene",
+                           subs=[inner, self.build(40, 43, strand=-1, phase="5")])
+        with patch.object(gff_parser, "MODIFY_LOCATIONS_BY_PHASE", True):
+            with self.assertRaises(errors.AntismashInputError):
+                gff_parser.check_sub(outer)
@@ -4,6 +4,7 @@
 # for test files, silence irrelevant and noisy pylint warnings
 # pylint: disable=no-self-use,protected-access,missing-docstring
 
+from tempfile import NamedTemporaryFile
 import unittest
 
 from antismash.common import utils
@@ -124,3 +125,21 @@ class TestDistanceCalculations(unittest.TestCase):
         cds.sec_met = SecMetQualifier()
         self.record.add_cds_feature(cds)
         assert utils.distance_to_pfam(self.record, self.query, ["test"]) == -1
+
+
+class TestHMMLengths(unittest.TestCase):
+    def test_lengths(self):
+        content = ("HMMER3/f [3.1b2 | February 2015]\r\n"
+                   "NAME  first\r\n"
+                   "ACC   PF00001.1\r\n"
+                   "LENG  57\r\n"
+                   "HMM          A        C\r\n"
+                   "//\r\n"
+                   "HMMER3/f [3.1b2 | February 2015]\n"
+                   "NAME  second.domain\n"
+                   "LENG  105\n"
+                   "//\n")
+        with NamedTemporaryFile("w") as handle:
+            handle.write(content)
+            handle.flush()
+            assert utils.get_hmm_lengths(handle.name) == {"first": 57, "second.domain": 105}
@@ -15,6 +15,11 @@ from Bio.SeqFeature import FeatureLocation
 from .fasta import read_fasta
 from .secmet import Feature, Record
 
+# a translation table that removes all ASCII characters that aren't protein letters
+_INVALID_PROTEIN_LETTER_REMOVER = str.maketrans("", "", "".join(
+    chr(i) for i in range(128) if chr(i) not in Bio.Data.IUPACData.protein_letters
+))
+
 
 class RobustProteinAnalysis(ProteinAnalysis):
     """ A simple subclass of ProteinAnalysis that can deal with
@@ -23,7 +28,7 @@ class RobustProteinAnalysis(ProteinAnalysis):
         If ignoring invalid characters, the molecular weight is increased by
         the average weight of an amino-acid (i.e. 110) for each invalid case.
     """
-    PROTEIN_LETTERS = set(Bio.Data.IUPACData.protein_letters)
+    PROTEIN_LETTERS = frozenset(Bio.Data.IUPACData.protein_letters)
 
     def __init__(self, prot_sequence: str, monoisotopic: bool = False,
                  ignore_invalid: bool = True) -> None:
@@ -35,8 +40,9 @@ class RobustProteinAnalysis(ProteinAnalysis):
 
         self.original_sequence = prot_sequence
         # remove all invalids
-        prot_sequence = "".join(filter(lambda x: x in RobustProteinAnalysis.PROTEIN_LETTERS,
-                                       self.original_sequence))
+        prot_sequence = prot_sequence.translate(_INVALID_PROTEIN_LETTER_REMOVER)
+        if not prot_sequence.isascii():  # the table doesn't cover other characters
+            prot_sequence = "".join(filter(self.PROTEIN_LETTERS.__contains__, prot_sequence))
         super().__init__(prot_sequence, monoisotopic)
 
     def molecular_weight(self) -> float:
@@ -61,14 +67,11 @@ def extract_by_reference_positions(query: str, reference: str, ref_positions: Li
             positions
     """
     # adjust position of interest to account for gaps in the ref sequence alignment
-    positions = []
-    position_skipping_gaps = 0
-    for i, amino in enumerate(reference):
-        if amino in "-.":
-            continue
-        if position_skipping_gaps in ref_positions:
-            positions.append(i)
-        position_skipping_gaps += 1
+    # by mapping each residue of the unaligned reference to its aligned index
+    aligned_indices = [i for i, amino in enumerate(reference) if amino not in "-."]
+    # positions are always extracted in ascending order
+    positions = [aligned_indices[pos] for pos in sorted(set(ref_positions))
+                 if 0 <= pos < len(aligned_indices)]
     assert len(positions) == len(ref_positions)
     # extract positions from query sequence
     return "".join([query[i] for i in positions])
@@ -89,27 +92,24 @@ def distance_to_pfam(record: Record, query: Feature, hmmer_profiles: List[str])
             or -1 if no gene matching was found
     """
     max_range = 40000
-    search_range = FeatureLocation(query.location.start - max_range,
-                                   query.location.end + max_range)
+    query_start = query.location.start
+    query_end = query.location.end
+    search_range = FeatureLocation(query_start - max_range, query_end + max_range)
     close_cds_features = record.get_cds_features_within_location(search_range, with_overlapping=True)
-    def distance_between(first: Feature, second: Feature) -> int:
-        """ Calculates smallest distance between two feature endpoints """
-        return min([abs(first.location.start - second.location.end),
-                    abs(first.location.end - second.location.start),
-                    abs(first.location.start - second.location.start),
-                    abs(first.location.end - second.location.end)
-                    ])
 
     # For nearby CDS features, check if they have hits to the pHMM
     profiles = set(hmmer_profiles)
     closest_distance = -1
     for cds in close_cds_features:
-        if cds.sec_met is None:
+        if cds.sec_met is None or profiles.isdisjoint(cds.sec_met.domain_ids):
             continue
-        if set(cds.sec_met.domain_ids).intersection(profiles):
-            distance = distance_between(query, cds)
-            if closest_distance == -1 or distance < closest_distance:
-                closest_distance = distance
+        # the smallest distance between any two feature endpoints
+        start = cds.location.start
+        end = cds.location.end
+        distance = min(abs(query_start - end), abs(query_end - start),
+                       abs(query_start - start), abs(query_end - end))
+        if closest_distance == -1 or distance < closest_distance:
+            closest_distance = distance
     return closest_distance
 
 
@@ -123,16 +123,17 @@ def get_hmm_lengths(hmm_file: str) -> Dict[str, int]:
             a dictionary mapping each NAME field in the file to it's LENG field
     """
     lengths = {}
+    name = None
     with open(hmm_file, "r") as handle:
-        contents = handle.read()
-    contents = contents.replace("\r", "")
-    hmms = contents.split("//")[:-1]
-    for hmm in hmms:
-        namepart = hmm.split("NAME  ")[1]
-        name = namepart.split("\n")[0]
-        lengthpart = hmm.split("LENG  ")[1]
-        length = lengthpart.split("\n")[0]
-        lengths[name] = int(length)
+        for line in handle:
+            if line.startswith("NAME "):
+                name = line[5:].strip()
+            elif line.startswith("LENG "):
+                if name is None:
+                    raise ValueError("HMM length found before name in %s" % hmm_file)
+                lengths[name] = int(line[5:])
+            elif line.startswith("//"):
+                name = None
     return lengths
 
 
@@ -6,9 +6,10 @@
    mostly for fungi/eukaryotes
 """
 
-from io import StringIO
 import logging
+from typing import IO
 
+from Bio.SeqRecord import SeqRecord
 from helperlibs.bio import seqio
 from helperlibs.wrappers.io import TemporaryDirectory
 
@@ -26,22 +27,23 @@ def write_search_fasta(record: Record) -> str:
             the name of the file created
     """
     filename = "{}.fasta".format(record.id)
+    # only the sequence is written, so avoid converting every feature in the record
+    bio_record = SeqRecord(record.seq, id=record.id, description=record.description)
     with open(filename, 'w') as handle:
-        seqio.write([record.to_biopython()], handle, 'fasta')
+        seqio.write([bio_record], handle, 'fasta')
     return filename
 
 
-def run_external(fasta_filename: str) -> str:
-    """ Runs glimmerhmm on the provided fasta file and returns the stdout output
-        from glimmerhmm.
+def run_external(fasta_filename: str, handle: IO) -> None:
+    """ Runs glimmerhmm on the provided fasta file, writing the stdout output
+        from glimmerhmm to the given handle.
     """
     glimmerhmm = ['glimmerhmm', fasta_filename,
                   path.get_full_path(__file__, "data/train_crypto"), "-g"]
-    run_result = execute(glimmerhmm)
+    run_result = execute(glimmerhmm, stdout=handle)
     if run_result.stderr.find('ERROR') > -1:
         logging.error("Failed to run GlimmerHMM: %r", run_result.stderr)
         raise RuntimeError("Failed to run GlimmerHMM: %s" % run_result.stderr)
-    return run_result.stdout
 
 
 def run_glimmerhmm(record: Record) -> None:
@@ -55,12 +57,14 @@ def run_glimmerhmm(record: Record) -> None:
         # Write FASTA file and run GlimmerHMM
         fasta_file = write_search_fasta(record)
         record.id = orig_id
-        results_text = run_external(fasta_file)
+        # the output is parsed directly from file, rather than held in memory
+        with open("glimmerhmm.gff", "w+") as handle:
+            run_external(fasta_file, handle)
+            handle.seek(0)
+            if not any("CDS" in line for line in handle):
+                return
+            handle.seek(0)
+            features = get_features_from_file(handle)["input"]
 
-    if not "CDS" in results_text:
-        return
-
-    handle = StringIO(results_text)
-    features = get_features_from_file(handle)["input"]
     for feature in features:
         record.add_biopython_feature(feature)
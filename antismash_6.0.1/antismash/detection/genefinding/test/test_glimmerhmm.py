@@ -0,0 +1,66 @@
+# License: GNU Affero General Public License v3 or later
+# A copy of GNU AGPL v3 should have been included in this software package in LICENSE.txt.
+
+# for test files, silence irrelevant and noisy pylint warnings
+# pylint: disable=no-self-use,protected-access,missing-docstring
+
+from importlib import import_module
+from io import StringIO
+import unittest
+from unittest.mock import patch
+
+from helperlibs.bio import seqio
+from helperlibs.wrappers.io import TemporaryDirectory
+
+from antismash.common import subprocessing
+from antismash.common.test.helpers import DummyCDS, DummyRecord
+
+# the package exports a function of the same name, so fetch the module itself
+run_glimmerhmm = import_module("antismash.detection.genefinding.run_glimmerhmm")
+
+
+class TestSearchFasta(unittest.TestCase):
+    def test_matches_full_record(self):
+        record = DummyRecord(seq="ACGT" * 40)
+        record.id = "input"
+        record.description = "some description"
+        record.add_cds_feature(DummyCDS(0, 12))
+
+        expected = StringIO()
+        seqio.write([record.to_biopython()], expected, "fasta")
+
+        with TemporaryDirectory(change=True):
+            filename = run_glimmerhmm.write_search_fasta(record)
+            assert filename == "input.fasta"
+            with open(filename) as handle:
+                assert handle.read() == expected.getvalue()
+
+
+class TestRunGlimmerHMM(unittest.TestCase):
+    def run_with_output(self, output):
+        def fake_execute(commands, stdout=None, **_kwargs):
+            assert commands[0] == "glimmerhmm"
+            stdout.write(output)
+            stdout.flush()
+            return subprocessing.RunResult(commands, None, b"", 0, False, True)
+
+        record = DummyRecord(seq="ACGT" * 40)
+        record.id = "orig"
+        with patch.object(run_glimmerhmm, "execute", side_effect=fake_execute):
+            run_glimmerhmm.run_glimmerhmm(record)
+        assert record.id == "orig"
+        return record
+
+    def test_no_genes(self):
+        record = self.run_with_output("##gff-version 3\n##sequence-region input 1 160\n")
+        assert not record.get_cds_features()
+
+    def test_genes(self):
+        record = self.run_with_output(
+            "##gff-version 3\n"
+            "##sequence-region input 1 160\n"
+            "input\tGlimmerHMM\tmRNA\t1\t12\t.\t+\t.\tID=input.path1.gene1;Name=input.path1.gene1\n"
+            "input\tGlimmerHMM\tCDS\t1\t12\t.\t+\t0\tID=input.cds1.1;Parent=input.path1.gene1;"
+            "Name=input.path1.gene1;Note=initial-exon\n"
+        )
+        assert len(record.get_cds_features()) == 1
@@ -21,6 +21,7 @@ that form but occasionally has MeO.
 """
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Dict, Iterator, List, Optional
 
 from antismash.common.hmmscan_refinement import HMMResult
@@ -431,9 +432,10 @@ class Module:
         return "-".join(state)
 
 
+@lru_cache(maxsize=None)
 def classify(profile_name: str) -> str:
     """ Classifies a profile name, raising an exception if classification not
-        possible
+        possible. Results are cached, since the classifications are fixed.
 
         Arguments:
             profile_name: the name of the profile used to find a domain
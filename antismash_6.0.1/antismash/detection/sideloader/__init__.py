@@ -6,6 +6,7 @@
 
 import argparse
 import os
+import re
 from typing import Any, AnyStr, Dict, List, Optional
 
 from antismash.common.module_results import DetectionResults
@@ -20,28 +21,26 @@ from .html_output import generate_html, will_handle
 NAME = "sideloader"
 SHORT_DESCRIPTION = "Side-loaded annotations"
 
+# ACCESSION:START-END, with the positions validated as numbers separately
+_SIMPLE_ARG_PATTERN = re.compile(r"([^:]+):([^:-]*)-([^:-]*)")
+
 
 def _parse_arg(option: str) -> SideloadSimple:
     """ Parses a string in the form ACCESSION:START-END into a matching
         SideloadSimple instance
     """
-    error = ValueError("invalid format, expected ACCESSION:START-END")
-    parts = option.split(":")
-    if len(parts) != 2:
-        raise error
-    if not parts[0]:
-        raise error
-    positions = parts[1].split("-")
-    if len(positions) != 2:
-        raise error
+    match = _SIMPLE_ARG_PATTERN.fullmatch(option)
+    if not match:
+        raise ValueError("invalid format, expected ACCESSION:START-END")
+    accession, start_text, end_text = match.groups()
     try:
-        start = int(positions[0])
-        end = int(positions[1])
+        start = int(start_text)
+        end = int(end_text)
     except ValueError:
         raise ValueError("positions are not numeric")
     if start >= end:
         raise ValueError("start must be before end")
-    return SideloadSimple(parts[0], start, end)
+    return SideloadSimple(accession, start, end)
 
 
 class SideloadAction(argparse.Action):
@@ -449,8 +449,8 @@ def find_diamond_matches(record: Record, database: str) -> Tuple[HitsByCDS, Hits
     ]
     features = record.get_cds_features_within_regions()
 
-    with NamedTemporaryFile() as temp_file:
-        temp_file.write(fasta.get_fasta_from_features(features, numeric_names=True).encode())
+    with NamedTemporaryFile("w") as temp_file:
+        fasta.write_fasta_from_features(features, temp_file, numeric_names=True)
         temp_file.flush()
         raw = subprocessing.run_diamond_search(temp_file.name, database, mode="blastp", opts=extra_args)
     return blast_parse(raw, dict(enumerate(features)))
@@ -3,6 +3,7 @@
 
 """ Handles HTML generation for the clusterblast variants """
 
+from functools import lru_cache
 from typing import List
 
 from antismash.common import path
@@ -50,11 +51,19 @@ def generate_html(region_layer: RegionLayer, _results: ClusterBlastResults,
     return html
 
 
+@lru_cache(maxsize=None)
+def _get_template(search_type: str) -> FileTemplate:
+    """ Builds the template for the given variant of clusterblast on first use,
+        then reuses it for each region
+    """
+    return FileTemplate(path.get_full_path(__file__, "templates", "%s.html" % search_type))
+
+
 def generate_div(region_layer: RegionLayer, record_layer: RecordLayer,
                  options_layer: OptionsLayer, search_type: str,
                  tooltip: str) -> Markup:
     """ Generates the specific HTML section of the body for a given variant of
         clusterblast
     """
-    template = FileTemplate(path.get_full_path(__file__, "templates", "%s.html" % search_type))
+    template = _get_template(search_type)
     return template.render(record=record_layer, region=region_layer, options=options_layer, tooltip=tooltip)
@@ -4,6 +4,7 @@
 """ Manages HTML construction for the Lassopeptide module
 """
 
+from functools import lru_cache
 from typing import List
 
 from antismash.common import path
@@ -18,26 +19,31 @@ def will_handle(products: List[str]) -> bool:
     return 'lassopeptide' in products
 
 
+@lru_cache(maxsize=None)
+def _get_template(filename: str) -> FileTemplate:
+    """ Builds the given template on first use, then reuses it for each region """
+    return FileTemplate(path.get_full_path(__file__, "templates", filename))
+
+
 def generate_html(region_layer: RegionLayer, results: LassoResults,
                   record_layer: RecordLayer, _options_layer: OptionsLayer) -> HTMLSections:
     """ Generates HTML for the module """
     html = HTMLSections("lassopeptides")
 
-    motifs_in_region = {}
-    for locus in results.motifs_by_locus:
-        if record_layer.get_cds_by_name(locus).is_contained_by(region_layer.region_feature):
-            motifs_in_region[locus] = results.motifs_by_locus[locus]
+    region = region_layer.region_feature
+    motifs_in_region = {locus: motifs for locus, motifs in results.motifs_by_locus.items()
+                        if record_layer.get_cds_by_name(locus).is_contained_by(region)}
 
     detail_tooltip = ("Lists the possible core peptides for each biosynthetic enzyme, including the predicted class. "
                       "Each core peptide shows the leader and core peptide sequences, separated by a dash.")
 
-    template = FileTemplate(path.get_full_path(__file__, "templates", "details.html"))
+    template = _get_template("details.html")
     html.add_detail_section("Lasso peptides", template.render(results=motifs_in_region, tooltip=detail_tooltip))
 
     side_tooltip = ("Lists the possible core peptides in the region. "
                     "Each core peptide lists the number of disulfide bridges, possible molecular weights, "
                     "and the scores for cleavage site prediction and RODEO.")
-    template = FileTemplate(path.get_full_path(__file__, "templates", "sidepanel.html"))
+    template = _get_template("sidepanel.html")
     html.add_sidepanel_section("Lasso peptides", template.render(results=motifs_in_region, tooltip=side_tooltip))
 
     return html
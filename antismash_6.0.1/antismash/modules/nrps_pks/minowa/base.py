@@ -5,9 +5,12 @@
     (e.g. CAL and AT domain analyses).
 """
 
+from functools import lru_cache
 import logging
-from os import path
-from typing import Any, Dict, List, Tuple
+from operator import itemgetter
+from os import devnull, path
+from tempfile import NamedTemporaryFile
+from typing import Any, Dict, IO, List, Optional, Tuple
 
 from jinja2 import Markup
 
@@ -15,12 +18,29 @@ from antismash.common import subprocessing, utils
 from antismash.modules.nrps_pks.data_structures import Prediction
 
 
+_GAP_TO_X = str.maketrans("-", "X")
+
+_HTML_START = (
+    "\n"
+    "<dl><dt>Prediction, score:</dt>\n"
+    " <dd>\n"
+    "  <dl>\n"
+)
+_HTML_END = (
+    "\n"
+    "  </dl>\n"
+    " </dd>\n"
+    "</dl>\n"
+)
+
+
 class MinowaPrediction(Prediction):
     """ Holds Minowa results for a domain """
     def __init__(self, results: List[Tuple[str, float]]) -> None:
         super().__init__("minowa")
         assert results
         self.predictions = results
+        self._html: Optional[Markup] = None
 
     def get_classification(self) -> List[str]:
         return [self.predictions[0][0]]
@@ -30,20 +50,11 @@ class MinowaPrediction(Prediction):
                 "predictions": self.predictions}
 
     def as_html(self) -> Markup:
-        raw_start = (
-            "\n"
-            "<dl><dt>Prediction, score:</dt>\n"
-            " <dd>\n"
-            "  <dl>\n"
-        )
-        core = "\n".join("  <dd></dd><dt>%s: %.1f</dt>\n" % (name, score) for name, score in self.predictions)
-        raw_end = (
-            "\n"
-            "  </dl>\n"
-            " </dd>\n"
-            "</dl>\n"
-        )
-        return Markup("%s%s%s" % (raw_start, core, raw_end))
+        # the predictions don't change after construction, so only build it once
+        if self._html is None:
+            core = "\n".join(["  <dd></dd><dt>%s: %.1f</dt>\n" % (name, score) for name, score in self.predictions])
+            self._html = Markup(_HTML_START + core + _HTML_END)
+        return self._html
 
     @staticmethod
     def from_json(json: Dict[str, Any]) -> "MinowaPrediction":
@@ -51,28 +62,73 @@ class MinowaPrediction(Prediction):
         return MinowaPrediction(json["predictions"])
 
 
-def hmmsearch(fasta_format: str, hmm: str) -> float:
-    """ Runs hmmsearch, only taking a single value from the output """
-    result = subprocessing.execute(["hmmsearch", "--noali", hmm, "-"], stdin=fasta_format)
-    if not result.successful():
-        logging.error("hmmsearch stderr: %s", result.stderr)
-        raise RuntimeError("hmmsearch exited non-zero")
+def hmmsearch(fasta_format: bytes, hmm: str) -> Dict[str, float]:
+    """ Runs hmmsearch, only taking a single value from the output for each
+        profile in the given HMM file
 
-    if "[No targets detected" in result.stdout:
-        return 0.
+        Arguments:
+            fasta_format: the query sequence, in fasta format as bytes
+            hmm: the path to the HMM file containing one or more profiles
 
-    text = result.stdout
-    start = text.find('Domain annotation for each sequence:')
-    end = text[start:].find('Internal pipeline statistics summary:')
-    lines = text[start:start + end].splitlines()
-    return float(lines[4].split()[2])
+        Returns:
+            a dictionary mapping profile name to the score of the first domain
+            hit by that profile, profiles without hits are not included
+    """
+    # the per-domain table is much simpler to parse than the standard output,
+    # which isn't needed at all
+    # and since the target is a single short signature, worker threads only add
+    # overhead, especially with queries already being run in parallel
+    with NamedTemporaryFile("r", suffix=".domtbl") as table:
+        result = subprocessing.execute(["hmmsearch", "--cpu", "0", "-o", devnull,
+                                        "--domtblout", table.name, hmm, "-"],
+                                       stdin=fasta_format)
+        if not result.successful():
+            logging.error("hmmsearch stderr: %s", result.stderr)
+            raise RuntimeError("hmmsearch exited non-zero")
+
+        scores: Dict[str, float] = {}
+        for line in table:
+            if line.startswith("#"):
+                continue
+            fields = line.split()
+            # domains are listed in order, so only the first for each profile is kept
+            scores.setdefault(fields[3], float(fields[13]))
+    return scores
+
+
+def _write_combined_hmm(data_dir: str, hmm_names: List[str], handle: IO[str]) -> None:
+    """ Writes the HMM profiles with the given names into a single HMM file,
+        in the order given. Each profile is renamed to the name of the file it
+        came from, so that hits can be mapped back to the file regardless of
+        the profile names within each file.
+
+        Arguments:
+            data_dir: the directory containing the HMM profiles
+            hmm_names: the names of the HMM profiles to combine
+            handle: the file handle to write the combined profiles to
+    """
+    for hmmname in hmm_names:
+        with open(path.join(data_dir, hmmname + ".hmm"), "r") as profile:
+            for line in profile:
+                if line.startswith("NAME "):
+                    line = "NAME  %s\n" % hmmname
+                handle.write(line)
+    handle.flush()
+
+
+@lru_cache(maxsize=None)
+def _read_positions(filename: str, startpos: int) -> Tuple[int, ...]:
+    """ Reads the signature positions from the file provided, cached since
+        the position files are static data
+    """
+    with open(filename, "r") as handle:
+        text = handle.read().strip().replace(' ', '_')
+    return tuple(int(i) - startpos for i in text.split("\t"))
 
 
 def get_positions(filename: str, startpos: int) -> List[int]:
     """ Reads the signature positions from the file provided """
-    with open(filename, "r") as handle:
-        text = handle.read().strip().replace(' ', '_')
-    return [int(i) - startpos for i in text.split("\t")]
+    return list(_read_positions(filename, startpos))
 
 
 def run_minowa(sequence_info: Dict[str, str], startpos: int, muscle_ref: str, ref_sequence: str,
@@ -96,24 +152,74 @@ def run_minowa(sequence_info: Dict[str, str], startpos: int, muscle_ref: str, re
             an instance of MinowaResults, which is a subclass of dict
                 mapping query sequence id to MinowaPrediction
     """
+    if not sequence_info:
+        return {}
+
     positions = get_positions(positions_file, startpos)
 
+    # each query is independent, so spread them over multiple processes
+    signatures = subprocessing.parallel_function_for_jobs(_extract_signature,
+                                                          [[query_id, query_seq, muscle_ref, ref_sequence, positions]
+                                                           for query_id, query_seq in sequence_info.items()])
+
+    # repeated domains often share a signature, so only search each distinct one once
+    unique_signatures = list(dict.fromkeys(signatures))
+
+    # searching all profiles with a single hmmsearch per signature saves the startup
+    # costs of running hmmsearch separately for each profile
+    with NamedTemporaryFile("w", suffix=".hmm") as combined_hmm:
+        _write_combined_hmm(data_dir, hmm_names, combined_hmm)
+        scores = subprocessing.parallel_function_for_jobs(_score_signature,
+                                                          [[signature, combined_hmm.name, hmm_names]
+                                                           for signature in unique_signatures])
+    scores_by_signature = dict(zip(unique_signatures, scores))
+
     results_by_query: Dict[str, Prediction] = {}
+    for query_id, signature in zip(sequence_info, signatures):
+        results_by_query[query_id] = MinowaPrediction(list(scores_by_signature[signature]))
+    return results_by_query
 
-    for query_id, query_seq in sequence_info.items():
-        muscle = subprocessing.run_muscle_single(query_id, query_seq, muscle_ref)
 
-        # count residues in ref sequence and put positions in list
-        # extract positions from query sequence and create fasta formatted seq
-        # to use as input for hmm searches
-        seq = utils.extract_by_reference_positions(muscle[query_id], muscle[ref_sequence], positions)
-        fasta_format = ">%s\n%s\n" % (query_id, seq.replace("-", "X"))
+def _extract_signature(query_id: str, query_seq: str, muscle_ref: str, ref_sequence: str,
+                       positions: List[int]) -> str:
+    """ Extracts the signature of a single query sequence by aligning it against
+        the reference set.
 
-        # then use list to extract positions from every sequence -> HMMs (one time, without any query sequence)
-        hmm_scores = {}
-        for hmmname in hmm_names:
-            hmm_scores[hmmname] = hmmsearch(fasta_format, path.join(data_dir, hmmname + ".hmm"))
+        Arguments:
+            query_id: the id of the query sequence
+            query_seq: the query sequence
+            muscle_ref: the path of a file containing reference sequence to align against
+            ref_sequence: the reference sequence to base extractions on
+            positions: the signature extraction positions
 
-        results = sorted(hmm_scores.items(), reverse=True, key=lambda x: (x[1], x[0]))
-        results_by_query[query_id] = MinowaPrediction(results)
-    return results_by_query
+        Returns:
+            the signature of the query, with any gaps replaced by X
+    """
+    muscle = subprocessing.run_muscle_single(query_id, query_seq, muscle_ref)
+
+    # count residues in ref sequence and put positions in list
+    # extract positions from query sequence to use as input for hmm searches
+    seq = utils.extract_by_reference_positions(muscle[query_id], muscle[ref_sequence], positions)
+    return seq.translate(_GAP_TO_X)
+
+
+def _score_signature(signature: str, hmm_file: str, hmm_names: List[str]) -> List[Tuple[str, float]]:
+    """ Scores a single signature against a set of HMM profiles.
+
+        Arguments:
+            signature: the signature to score
+            hmm_file: the path of a HMM file containing all the profiles, with
+                      each profile named by its HMM name
+            hmm_names: the names of the HMM profiles
+
+        Returns:
+            a list of tuples, each containing the HMM name and score, ordered
+            from best to worst score
+    """
+    fasta_format = f">signature\n{signature}\n".encode()
+
+    # then use list to extract positions from every sequence -> HMMs (one time, without any query sequence)
+    scores = hmmsearch(fasta_format, hmm_file)
+    hmm_scores = {hmmname: scores.get(hmmname, 0.) for hmmname in hmm_names}
+
+    return sorted(hmm_scores.items(), reverse=True, key=itemgetter(1, 0))
@@ -0,0 +1,163 @@
+# License: GNU Affero General Public License v3 or later
+# A copy of GNU AGPL v3 should have been included in this software package in LICENSE.txt.
+
+# for test files, silence irrelevant and noisy pylint warnings
+# pylint: disable=no-self-use,protected-access,missing-docstring
+
+import os
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+import unittest
+from unittest.mock import patch
+
+from antismash.common import subprocessing
+from antismash.config import build_config, destroy_config
+from antismash.modules.nrps_pks.minowa import base
+
+
+def domain_row(profile, domain_number, domain_count, score):
+    # fields not used by the parser are filled with dummy values
+    fields = ["query", "-", "34", profile, "-", "34", "1.1e-25", "81.1", "0.0",
+              str(domain_number), str(domain_count), "1.2e-25", "1.2e-25", score, "0.0",
+              "1", "34", "1", "34", "1", "34", "1.00", "-"]
+    return " ".join(fields)
+
+
+DOMAIN_TABLE = "\n".join([
+    "# target name accession tlen query name accession qlen ...",
+    "#------------------- ---------- ----- ...",
+    domain_row("first", 1, 2, "80.9"),
+    domain_row("first", 2, 2, "0.2"),
+    domain_row("third", 1, 1, "-3.2"),
+    "#",
+    "# Program:         hmmsearch",
+    "# [ok]",
+    "",
+])
+
+
+class TestHmmsearch(unittest.TestCase):
+    def run_with_table(self, table, return_code=0):
+        def fake_execute(command, **_kwargs):
+            with open(command[command.index("--domtblout") + 1], "w") as handle:
+                handle.write(table)
+            return subprocessing.RunResult(command, b"", b"error", return_code, True, True)
+
+        with patch.object(subprocessing, "execute", side_effect=fake_execute):
+            return base.hmmsearch(b">query\nSEQ\n", "dummy.hmm")
+
+    def test_multiple_profiles(self):
+        assert self.run_with_table(DOMAIN_TABLE) == {"first": 80.9, "third": -3.2}
+
+    def test_no_hits(self):
+        assert self.run_with_table("# [ok]\n") == {}
+
+    def test_failure(self):
+        with self.assertRaisesRegex(RuntimeError, "exited non-zero"):
+            self.run_with_table("", return_code=1)
+
+
+class TestCombinedHMM(unittest.TestCase):
+    def write_profiles(self, directory, profiles):
+        for filename, content in profiles.items():
+            with open(os.path.join(directory, filename + ".hmm"), "w") as handle:
+                handle.write(content)
+
+    def combine(self, profiles, names):
+        with TemporaryDirectory() as data_dir:
+            self.write_profiles(data_dir, profiles)
+            with NamedTemporaryFile("w+") as combined:
+                base._write_combined_hmm(data_dir, names, combined)
+                combined.seek(0)
+                return combined.read()
+
+    def test_combine(self):
+        result = self.combine({"a": "HMMER3/f\nNAME  first\n//\n",
+                               "b": "HMMER3/f\nNAME  second\n//\n"}, ["b", "a"])
+        assert result == "HMMER3/f\nNAME  b\n//\nHMMER3/f\nNAME  a\n//\n"
+
+    def test_shared_profile_names(self):
+        result = self.combine({"a": "HMMER3/f\nNAME  first\n//\n",
+                               "b": "HMMER3/f\nNAME  first\n//\n"}, ["a", "b"])
+        assert result == "HMMER3/f\nNAME  a\n//\nHMMER3/f\nNAME  b\n//\n"
+
+    def test_multiple_profiles_in_file(self):
+        result = self.combine({"a": "NAME  first\nLENG  5\n//\nNAME  second\n//\n"}, ["a"])
+        assert result == "NAME  a\nLENG  5\n//\nNAME  a\n//\n"
+
+
+class TestPositions(unittest.TestCase):
+    def test_read(self):
+        with NamedTemporaryFile("w") as handle:
+            handle.write("10\t12\t15\n")
+            handle.flush()
+            first = base.get_positions(handle.name, 7)
+            assert first == [3, 5, 8]
+            # modifying the result must not affect later calls
+            first.append(1)
+            assert base.get_positions(handle.name, 7) == [3, 5, 8]
+            assert base.get_positions(handle.name, 10) == [0, 2, 5]
+
+
+class TestPrediction(unittest.TestCase):
+    def test_html(self):
+        prediction = base.MinowaPrediction([("first", 80.9), ("second", 0.)])
+        html = prediction.as_html()
+        assert "<dt>first: 80.9</dt>" in html
+        assert "<dt>second: 0.0</dt>" in html
+        assert prediction.as_html() is html
+
+    def test_json_conversion(self):
+        prediction = base.MinowaPrediction([("first", 80.9), ("second", 0.)])
+        rebuilt = base.MinowaPrediction.from_json(prediction.to_json())
+        assert rebuilt.predictions == prediction.predictions
+        assert rebuilt.as_html() == prediction.as_html()
+
+
+class TestRunMinowa(unittest.TestCase):
+    def setUp(self):
+        build_config(["--cpus", "1"])
+
+    def tearDown(self):
+        destroy_config()
+
+    def test_shared_signatures_searched_once(self):
+        alignments = {
+            "a": {"a": "MAGIC", "ref": "MAGIC"},
+            "b": {"b": "MAGIC", "ref": "MAGIC"},
+            "c": {"c": "MA-IC", "ref": "MAGIC"},
+        }
+
+        def fake_muscle(name, _seq, _ref_file):
+            return alignments[name]
+
+        searched = []
+
+        def fake_hmmsearch(fasta_format, _hmm_file):
+            searched.append(fasta_format)
+            return {"one": 5.} if b"X" in fasta_format else {"two": 10.}
+
+        with TemporaryDirectory() as data_dir:
+            for name in ["one", "two"]:
+                with open(os.path.join(data_dir, name + ".hmm"), "w") as handle:
+                    handle.write("NAME  profile\n//\n")
+            positions_file = os.path.join(data_dir, "positions.txt")
+            with open(positions_file, "w") as handle:
+                handle.write("1\t2\t3")
+            with patch.object(subprocessing, "run_muscle_single", side_effect=fake_muscle):
+                with patch.object(base, "hmmsearch", side_effect=fake_hmmsearch):
+                    results = base.run_minowa({"a": "MAGIC", "b": "MAGIC", "c": "MAIC"}, 0, "ref.fasta",
+                                              "ref", positions_file, data_dir, ["one", "two"])
+
+        assert searched == [b">signature\nAGI\n", b">signature\nAXI\n"]
+        assert list(results) == ["a", "b", "c"]
+        assert results["a"].predictions == [("two", 10.), ("one", 0.)]
+        assert results["b"].predictions == results["a"].predictions
+        assert results["b"] is not results["a"]
+        assert results["c"].predictions == [("one", 5.), ("two", 0.)]
+
+    def test_empty(self):
+        with patch.object(subprocessing, "parallel_function_for_jobs") as patched:
+            with patch.object(base, "_write_combined_hmm") as combined:
+                assert base.run_minowa({}, 0, "ref.fasta", "ref", "missing.txt", "missing", ["one"]) == {}
+        patched.assert_not_called()
+        combined.assert_not_called()
@@ -3,16 +3,17 @@
 
 """ Calculates a likely order of NRPS/PKS domains """
 
+import bisect
 import itertools
 import logging
 import os
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from antismash.common import path, subprocessing, utils
 from antismash.common.secmet import CDSFeature, Record
 
 from .html_output import will_handle
-from .results import CandidateClusterPrediction, modify_substrate
+from .results import CandidateClusterPrediction, get_module_substrate, modify_substrate
 from .smiles_generator import gen_smiles_from_pksnrps
 
 
@@ -39,11 +40,20 @@ def analyse_biosynthetic_order(nrps_pks_features: List[CDSFeature],
                              if will_handle(cluster.products)]
     if not candidate_clusters:
         return []
+    # sort the features by start, tracking the furthest end seen so far, so that only
+    # those features with bounds overlapping a candidate cluster need to be checked
+    by_start = sorted(range(len(nrps_pks_features)), key=lambda i: nrps_pks_features[i].location.start)
+    starts = [nrps_pks_features[i].location.start for i in by_start]
+    furthest_ends = list(itertools.accumulate((nrps_pks_features[i].location.end for i in by_start), max))
     # Predict biosynthetic gene order in candidate clusters using starter domains,
     # thioesterase domains, gene order and docking domains
     for candidate_cluster in candidate_clusters:
         candidate_cluster_number = candidate_cluster.get_candidate_cluster_number()
-        cds_in_candidate_cluster = [gene for gene in nrps_pks_features if gene.overlaps_with(candidate_cluster)]
+        lower = bisect.bisect_right(furthest_ends, candidate_cluster.location.start)
+        upper = bisect.bisect_left(starts, candidate_cluster.location.end)
+        # keep the original order of the features
+        cds_in_candidate_cluster = [nrps_pks_features[i] for i in sorted(by_start[lower:upper])
+                                    if nrps_pks_features[i].overlaps_with(candidate_cluster)]
         if not cds_in_candidate_cluster:
             continue
         pks_features, nrps_count, hybrid_count = find_candidate_cluster_modular_enzymes(cds_in_candidate_cluster)
@@ -125,12 +135,7 @@ def generate_substrates_order(geneorder: List[CDSFeature], consensus_predictions
         for module in gene.modules:
             if not module.is_complete():
                 continue
-            substrate = ""
-            for domain in module.domains:
-                consensus = consensus_predictions.get(domain.get_name())
-                if consensus:
-                    substrate = consensus
-                    break
+            substrate = get_module_substrate(module, consensus_predictions)
             monomer = modify_substrate(module, substrate)
             if not monomer:
                 continue
@@ -203,19 +208,13 @@ def extract_nterminus(data_dir: str, cds_features: List[CDSFeature], start_cds:
         -scan for docking domains using hmmsearch
         -parse output to locate interacting residues
     """
-    n_terminal_residues = {}
-    n_terminals = {}
+    n_terminals: Dict[str, str] = {}
     nterm_file = os.path.join(data_dir, 'nterm.fasta')
     for cds in cds_features:
         if cds is not start_cds:
             seq = str(cds.translation)
             n_terminals[cds.get_name()] = seq[:50]
-    for name, seq in n_terminals.items():
-        alignments = subprocessing.run_muscle_single(name, seq, nterm_file)
-        query_seq = alignments[name]
-        ref_seq = alignments["EryAIII_5_6_ref"]
-        n_terminal_residues[name] = utils.extract_by_reference_positions(query_seq, ref_seq, [2, 15])
-    return n_terminal_residues
+    return _align_terminals(n_terminals, nterm_file, "EryAIII_5_6_ref", [2, 15])
 
 
 def extract_cterminus(data_dir: str, cds_features: List[CDSFeature], end_cds: Optional[CDSFeature]) -> Dict[str, str]:
@@ -230,34 +229,76 @@ def extract_cterminus(data_dir: str, cds_features: List[CDSFeature], end_cds: Op
         Returns:
             A dictionary mapping gene name to the pair of residues extracted
     """
-    c_terminal_residues = {}
     c_terminals: Dict[str, str] = {}
     cterm_file = os.path.join(data_dir, 'cterm.fasta')
     for cds in cds_features:
         if cds is not end_cds:
             seq = str(cds.translation)
             c_terminals[cds.get_name()] = seq[-100:]
-    for name, seq in c_terminals.items():
-        alignments = subprocessing.run_muscle_single(name, seq, cterm_file)
-        query_seq = alignments[name]
-        ref_seq = alignments["EryAII_ref"]
-        c_terminal_residues[name] = utils.extract_by_reference_positions(query_seq, ref_seq, [55, 64])
-    return c_terminal_residues
+    return _align_terminals(c_terminals, cterm_file, "EryAII_ref", [55, 64])
+
+
+def _align_terminals(terminals: Dict[str, str], ref_file: str, ref_name: str,
+                     positions: List[int]) -> Dict[str, str]:
+    """ Extracts the residues at the given reference positions for each terminal
+        sequence. Identical sequences are only aligned once.
+
+        Arguments:
+            terminals: a dictionary mapping gene name to terminal sequence
+            ref_file: the path of the FASTA file containing the reference sequences
+            ref_name: the name of the reference sequence to base extractions on
+            positions: the positions within the reference to extract
+
+        Returns:
+            a dictionary mapping gene name to the extracted residues
+    """
+    # identical sequences, e.g. from repeated genes, only need to be aligned once
+    to_align: Dict[str, str] = {}
+    for name, seq in terminals.items():
+        to_align.setdefault(seq, name)
+    residues_by_seq: Dict[str, str] = {}
+    if to_align:
+        residues = subprocessing.parallel_function_for_jobs(_extract_terminal_residues,
+                                                            [[name, seq, ref_file, ref_name, positions]
+                                                             for seq, name in to_align.items()])
+        residues_by_seq = dict(zip(to_align, residues))
+    return {name: residues_by_seq[seq] for name, seq in terminals.items()}
+
+
+def _extract_terminal_residues(name: str, seq: str, ref_file: str, ref_name: str,
+                               positions: List[int]) -> str:
+    """ Aligns a single terminal sequence against the reference docking domains
+        and extracts the residues at the given reference positions.
+
+        Arguments:
+            name: the name of the terminal sequence
+            seq: the terminal sequence
+            ref_file: the path of the FASTA file containing the reference sequences
+            ref_name: the name of the reference sequence to base extractions on
+            positions: the positions within the reference to extract
+
+        Returns:
+            the extracted residues
+    """
+    alignments = subprocessing.run_muscle_single(name, seq, ref_file)
+    return utils.extract_by_reference_positions(alignments[name], alignments[ref_name], positions)
 
 
 def find_possible_orders(cds_features: List[CDSFeature], start_cds: Optional[CDSFeature],
-                         end_cds: Optional[CDSFeature]) -> List[List[CDSFeature]]:
+                         end_cds: Optional[CDSFeature]) -> Iterator[List[CDSFeature]]:
     """ Finds all possible arrangements of the given cds_features. If not None, the
         start gene will always be the first in each order. Similarly, the end
         gene will always be last.
 
+        Arrangements are generated as needed, in order of gene locations.
+
         Arguments:
             cds_features: a list of all CDSFeatures, may include start_cds and end_cds
             start_cds: None or the CDS with which to start every arrangement
             end_cds: None or the CDS with which to end every arrangement
 
         Returns:
-            a list of lists, each sublist being a unique ordering of the
+            an iterator over lists, each list being a unique ordering of the
             provided CDSFeatures
     """
     assert len(cds_features) < 11, "input too large, function is O(n!)"
@@ -265,66 +306,212 @@ def find_possible_orders(cds_features: List[CDSFeature], start_cds: Optional[CDS
     assert end_cds is None or isinstance(end_cds, CDSFeature)
     if start_cds or end_cds:
         assert start_cds != end_cds, "Using same gene for start and end of ordering"
-    cds_to_order = []
-    for cds in cds_features:
-        if cds in (start_cds, end_cds):
-            pass
-        else:
-            cds_to_order.append(cds)
-    possible_orders = []
+    cds_to_order = [cds for cds in cds_features if cds not in (start_cds, end_cds)]
     start: List[CDSFeature] = []
     if start_cds:
         start = [start_cds]
     end: List[CDSFeature] = []
     if end_cds:
         end = [end_cds]
-    for order in itertools.permutations(cds_to_order, len(cds_to_order)):
-        possible_orders.append(start + list(order) + end)
-    # ensure the list of possible orders is itself ordered for reliability
-    return sorted(possible_orders, key=lambda x: [g.location.start for g in x])
+
+    starts = [cds.location.start for cds in cds_to_order]
+    if len(set(starts)) < len(starts):
+        # genes sharing a start are ordered by their position in the input, which
+        # doesn't follow from the permutation order, so all orders have to be sorted
+        possible_orders = [start + list(order) + end for order in itertools.permutations(cds_to_order)]
+        return iter(sorted(possible_orders, key=lambda x: [g.location.start for g in x]))
+    # otherwise permutations of genes sorted by location are generated in location order
+    cds_to_order.sort(key=lambda cds: cds.location.start)
+    return (start + list(order) + end for order in itertools.permutations(cds_to_order))
+
+
+# residue classes used for scoring docking domain interactions:
+# hydrophobic, positively charged, negatively charged, and anything else
+_RESIDUE_CLASSES = dict.fromkeys("AVILFWYM", 0)
+_RESIDUE_CLASSES.update(dict.fromkeys("HKR", 1))
+_RESIDUE_CLASSES.update(dict.fromkeys("DE", 2))
+_OTHER_CLASS = 3
+# the score of each pairing of residue classes, where both hydrophobic or
+# opposite polarities score positively and the same polarity scores negatively
+_PAIR_SCORES = (
+    (1, 0, 0, 0),
+    (0, -1, 1, 0),
+    (0, 1, -1, 0),
+    (0, 0, 0, 0),
+)
+
+
+def _classify_residues(residues: Sequence[str]) -> Tuple[int, int]:
+    """ Classifies a pair of docking domain residues for scoring.
+
+        Arguments:
+            residues: the pair of residues
+
+        Returns:
+            a tuple of the class of each residue
+    """
+    first, second = residues
+    return _RESIDUE_CLASSES.get(first, _OTHER_CLASS), _RESIDUE_CLASSES.get(second, _OTHER_CLASS)
+
+
+def _score_interaction(c_terminal: Sequence[str], n_terminal: Sequence[str]) -> int:
+    """ Scores the interaction of one gene's C-terminal docking residues with
+        the next gene's N-terminal docking residues.
+
+        Arguments:
+            c_terminal: the pair of C-terminal residues of the first gene
+            n_terminal: the pair of N-terminal residues of the following gene
+
+        Returns:
+            the score of the interaction
+    """
+    c_first, c_second = _classify_residues(c_terminal)
+    n_first, n_second = _classify_residues(n_terminal)
+    return _PAIR_SCORES[c_first][n_first] + _PAIR_SCORES[c_second][n_second]
 
 
 def rank_biosynthetic_orders(n_terminal_residues: Dict[str, str],
                              c_terminal_residues: Dict[str, str],
-                             possible_orders: List[List[CDSFeature]]) -> List[CDSFeature]:
+                             possible_orders: Iterable[List[CDSFeature]]) -> List[CDSFeature]:
     """ Scores each possible order according to terminal pairs of adjacent cds_features.
 
         Arguments:
             n_terminal_residues: a dictionary mapping CDSFeature to their pair of N terminal residues
             c_terminal_residues: a dictionary mapping CDSFeature to their pair of C terminal residues
-            possible_orders: a list of gene orderings to evaluate
+            possible_orders: a list, or other iterable, of gene orderings to evaluate
 
         Returns:
             the first ordering that scored highest or equal highest
     """
-    assert possible_orders
+    # orders are only visited once, so they can be generated lazily
+    orders = iter(possible_orders)
+    first_order = next(orders, None)
+    assert first_order is not None
+    # classify each gene's residues once, instead of for every order it appears in
+    n_terminal_classes = {name: _classify_residues(residues) for name, residues in n_terminal_residues.items()}
+    c_terminal_classes = {name: _classify_residues(residues) for name, residues in c_terminal_residues.items()}
     # If docking domains found in all, check for optimal order using interacting residues
-    hydrophobic = {"A", "V", "I", "L", "F", "W", "Y", "M"}
-    positively_charged = {"H", "K", "R"}
-    negatively_charged = {"D", "E"}
     # find best scoring order
-    best_score = -2 * len(possible_orders[0])
-    best_order = possible_orders[0]
-    for order in possible_orders:
+    best_score = -2 * len(first_order)
+    best_order = first_order
+    for order in itertools.chain([first_order], orders):
         score = 0
-        interactions = [order[i:i + 2] for i in range(len(order) - 1)]
-        for gene, next_gene in interactions:
-            res1a, res2a = tuple(c_terminal_residues[gene.get_name()])
-            res1b, res2b = tuple(n_terminal_residues[next_gene.get_name()])
-            for pair in [{res1a, res1b}, {res2a, res2b}]:
-                both_hydrophobic = pair.issubset(hydrophobic)
-                same_polarity = pair.issubset(positively_charged) or pair.issubset(negatively_charged)
-                opposite_polarity = len(pair & positively_charged) * len(pair & negatively_charged) == 1
-                if both_hydrophobic or opposite_polarity:
-                    score += 1
-                elif same_polarity:
-                    score -= 1
+        for gene, next_gene in zip(order, order[1:]):
+            c_first, c_second = c_terminal_classes[gene.get_name()]
+            n_first, n_second = n_terminal_classes[next_gene.get_name()]
+            score += _PAIR_SCORES[c_first][n_first] + _PAIR_SCORES[c_second][n_second]
         if score > best_score:
             best_order = order
             best_score = score
     return best_order
 
 
+def find_best_order(cds_features: List[CDSFeature], start_cds: Optional[CDSFeature],
+                    end_cds: Optional[CDSFeature], n_terminal_residues: Dict[str, str],
+                    c_terminal_residues: Dict[str, str]) -> List[CDSFeature]:
+    """ Finds the best scoring order of the given CDS features according to
+        terminal pairs of adjacent features, without building every possible order.
+
+        The result is identical to ranking all orders from find_possible_orders()
+        with rank_biosynthetic_orders(), but partial orders that can't improve on
+        the best order found so far are abandoned early.
+
+        Arguments:
+            cds_features: a list of all CDSFeatures, may include start_cds and end_cds
+            start_cds: None or the CDS with which to start the order
+            end_cds: None or the CDS with which to end the order
+            n_terminal_residues: a dictionary mapping CDS name to their pair of N terminal residues
+            c_terminal_residues: a dictionary mapping CDS name to their pair of C terminal residues
+
+        Returns:
+            the first ordering, by location, that scored highest or equal highest
+    """
+    assert len(cds_features) < 11, "input too large, function is O(n!)"
+    if start_cds or end_cds:
+        assert start_cds != end_cds, "Using same gene for start and end of ordering"
+
+    # visiting genes in order of location visits full orders in the same order
+    # as find_possible_orders() sorts them, so the first best order found matches
+    to_order = sorted((cds for cds in cds_features if cds not in (start_cds, end_cds)),
+                      key=lambda cds: cds.location.start)
+    if not to_order:
+        return [cds for cds in [start_cds, end_cds] if cds]
+    # unless genes share a start, in which case equal scores have to be compared
+    # by location in the same way as find_possible_orders() does
+    starts = [cds.location.start for cds in to_order]
+    shared_starts = len(set(starts)) < len(starts)
+
+    # precalculate the score of each possible adjacent pair, indexed by position in to_order,
+    # with the start and end genes at the extra indices
+    start_index = len(to_order)
+    end_index = len(to_order) + 1
+    genes = dict(enumerate(to_order))
+    if start_cds:
+        genes[start_index] = start_cds
+    if end_cds:
+        genes[end_index] = end_cds
+    predecessors = list(range(len(to_order))) + ([start_index] if start_cds else [])
+    successors = list(range(len(to_order))) + ([end_index] if end_cds else [])
+    scores: Dict[int, Dict[int, int]] = {}
+    for i in predecessors:
+        c_terminal = c_terminal_residues[genes[i].get_name()]
+        scores[i] = {j: _score_interaction(c_terminal, n_terminal_residues[genes[j].get_name()])
+                     for j in successors if j != i}
+
+    best_score = -2 * (len(to_order) + 3)
+    best_order: List[int] = []
+    order: List[int] = []
+    unused = set(range(len(to_order)))
+
+    def upper_bound(last: Optional[int]) -> int:
+        """ The most that placing the remaining genes could add to the score """
+        # each gene, including the last placed, is followed by an unplaced gene or the end gene
+        following = list(unused) + ([end_index] if end_cds else [])
+        last_max = 0
+        if last is not None:
+            last_max = max(scores[last][j] for j in following)
+        unused_maxima = [max(scores[i][j] for j in following if j != i) for i in unused if len(following) > 1]
+        if end_cds or not unused_maxima:
+            return last_max + sum(unused_maxima)
+        # without a fixed end, one of the unplaced genes will be last and have no following gene
+        return last_max + sum(unused_maxima) - min(unused_maxima)
+
+    def order_key(indices: List[int]) -> Tuple[List[int], List[int]]:
+        """ The sorting key of an order, with ties broken by position in the input """
+        return [starts[i] for i in indices], indices
+
+    def extend(last: Optional[int], score: int) -> None:
+        """ Tries each unplaced gene after the last placed gene, depth first """
+        nonlocal best_score, best_order
+        if not unused:
+            if end_cds:
+                assert last is not None
+                score += scores[last][end_index]
+            if score > best_score or (shared_starts and score == best_score
+                                      and order_key(order) < order_key(best_order)):
+                best_score = score
+                best_order = list(order)
+            return
+        bound = score + upper_bound(last)
+        if bound < best_score or (bound == best_score and not shared_starts):
+            return
+        for i in sorted(unused):
+            new_score = score if last is None else score + scores[last][i]
+            unused.remove(i)
+            order.append(i)
+            extend(i, new_score)
+            order.pop()
+            unused.add(i)
+
+    extend(start_index if start_cds else None, 0)
+
+    if start_cds:
+        best_order.insert(0, start_index)
+    if end_cds:
+        best_order.append(end_index)
+    return [genes[i] for i in best_order]
+
+
 def perform_docking_domain_analysis(cds_features: List[CDSFeature]) -> List[CDSFeature]:
     """ Estimates gene ordering based on docking domains of features
 
@@ -335,14 +522,17 @@ def perform_docking_domain_analysis(cds_features: List[CDSFeature]) -> List[CDSF
             a list of CDSFeatures in estimated order
     """
     start_cds, end_cds = find_first_and_last_cds(cds_features)
+    # with at most one gene free to move, there's only one possible order
+    unfixed = [cds for cds in cds_features if cds not in (start_cds, end_cds)]
+    if len(unfixed) <= 1:
+        return [cds for cds in [start_cds] + unfixed + [end_cds] if cds]
+
     data_dir = path.get_full_path(__file__, "data", "terminals")
 
     n_terminal_residues = extract_nterminus(data_dir, cds_features, start_cds)
     c_terminal_residues = extract_cterminus(data_dir, cds_features, end_cds)
-    possible_orders = find_possible_orders(cds_features, start_cds, end_cds)
 
-    geneorder = rank_biosynthetic_orders(n_terminal_residues, c_terminal_residues, possible_orders)
-    return geneorder
+    return find_best_order(cds_features, start_cds, end_cds, n_terminal_residues, c_terminal_residues)
 
 
 def find_colinear_order(cds_features: List[CDSFeature]) -> List[CDSFeature]:
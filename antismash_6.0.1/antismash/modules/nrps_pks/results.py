@@ -4,8 +4,9 @@
 """ Contains the results classes for the nrps_pks module """
 
 from collections import defaultdict
+from functools import lru_cache
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
 from antismash.common.module_results import ModuleResults
 from antismash.common.secmet import Module, Record
@@ -35,7 +36,29 @@ DOMAIN_TYPE_MAPPING = {'Condensation_DCL': 'Condensation',
 UNKNOWN = "(unknown)"
 
 
-def modify_substrate(module: Module, base: str = "") -> str:  # pylint: disable=too-many-branches
+def get_module_substrate(module: Module, consensus_predictions: Dict[str, str]) -> str:
+    """ Finds the substrate of a module from the consensus predictions of its domains.
+
+        Arguments:
+            module: the Module holding the relevant domains
+            consensus_predictions: a dictionary mapping domain name to consensus prediction
+
+        Returns:
+            the first non-empty consensus prediction of the module's domains,
+            or an empty string if none of the domains have one
+    """
+    predictions = (consensus_predictions.get(domain.get_name()) for domain in module.domains)
+    return next(filter(None, predictions), "")
+
+
+_KR_CONVERSIONS = {"mal": "ohmal", "mmal": "ohmmal", "mxmal": "ohmxmal", "emal": "ohemal"}
+_DH_CONVERSIONS = {"ohmal": "ccmal", "ohmmal": "ccmmal", "ohmxmal": "ccmxmal", "ohemal": "ccemal"}
+_ER_CONVERSIONS = {"ccmal": "redmal", "ccmmal": "redmmal", "ccmxmal": "redmxmal", "ccemal": "redemal"}
+_DH_TYPES = frozenset({"PKS_DH", "PKS_DH2", "PKS_DHt"})
+_MT_MODIFICATIONS = {"nMT": "NMe", "cMT": "Me", "oMT": "OMe"}
+
+
+def modify_substrate(module: Module, base: str = "") -> str:
     """ Builds a monomer including modifications from the given base.
 
         Arguments:
@@ -49,38 +72,49 @@ def modify_substrate(module: Module, base: str = "") -> str:  # pylint: disable=
     if not module.is_complete():
         return ""
 
-    domains = {domain.domain for domain in module.domains}
+    methylations = []
+    for domain in module.domains:
+        assert isinstance(domain, ModularDomain)
+        if domain.domain == "MT":
+            methylations.append(domain.domain_subtype)
+
+    return _build_monomer(frozenset(domain.domain for domain in module.domains), tuple(methylations),
+                          module.module_type == Module.types.PKS, base)
+
+
+@lru_cache(maxsize=4096)
+def _build_monomer(domains: FrozenSet[str], methylations: Tuple[Optional[str], ...],
+                   is_pks: bool, base: str) -> str:
+    """ Builds a monomer including modifications from the given base, for
+        a complete module. Modules with the same content share a result.
+
+        Arguments:
+            domains: the types of each domain in the module
+            methylations: the subtypes of each MT domain in the module, in order
+            is_pks: whether the module is a PKS module
+            base: a string of the substate (or an empty string in case of trans-AT)
 
+        Returns:
+            the modified substrate, or an empty string if no appropriate base was
+            given
+    """
     if "PKS_KS" in domains and "PKS_AT" not in domains:
         base = "mal"
 
     if not base:
         return ""
 
-    if module.module_type == Module.types.PKS:
+    if is_pks:
         if "PKS_KR" in domains:
-            conversions = {"mal": "ohmal", "mmal": "ohmmal", "mxmal": "ohmxmal", "emal": "ohemal"}
-            base = conversions.get(base, base)
+            base = _KR_CONVERSIONS.get(base, base)
 
-        if {"PKS_DH", "PKS_DH2", "PKS_DHt"}.intersection(domains):
-            conversions = {"ohmal": "ccmal", "ohmmal": "ccmmal", "ohmxmal": "ccmxmal", "ohemal": "ccemal"}
-            base = conversions.get(base, base)
+        if not _DH_TYPES.isdisjoint(domains):
+            base = _DH_CONVERSIONS.get(base, base)
 
         if "PKS_ER" in domains:
-            conversions = {"ccmal": "redmal", "ccmmal": "redmmal", "ccmxmal": "redmxmal", "ccemal": "redemal"}
-            base = conversions.get(base, base)
+            base = _ER_CONVERSIONS.get(base, base)
 
-    state: List[str] = []
-    for domain in module.domains:
-        assert isinstance(domain, ModularDomain)
-        if domain.domain != "MT":
-            continue
-        if domain.domain_subtype == "nMT":
-            state.append("NMe")
-        elif domain.domain_subtype == "cMT":
-            state.append("Me")
-        elif domain.domain_subtype == "oMT":
-            state.append("OMe")
+    state = [_MT_MODIFICATIONS[subtype] for subtype in methylations if subtype in _MT_MODIFICATIONS]
 
     if base.endswith("mmal"):
         state.append("Me")
@@ -208,8 +242,10 @@ class NRPS_PKS_Results(ModuleResults):
 
         sig = UNKNOWN
         pks_sig = predictions["signature"]
-        if pks_sig and pks_sig.get_classification():
-            sig = pks_sig.get_classification()[0]
+        if pks_sig:
+            classification = pks_sig.get_classification()
+            if classification:
+                sig = classification[0]
         domain.predictions["PKS signature"] = sig
 
         minowa = predictions["minowa_at"].get_classification()[0]
@@ -245,6 +281,7 @@ class NRPS_PKS_Results(ModuleResults):
         for cds_feature in record.get_nrps_pks_cds_features():
             assert cds_feature.region, "CDS parent region removed since analysis"
             nrps_qualifier = cds_feature.nrps_pks
+            transat_cluster = "transatpks" in cds_feature.region.products
             for domain in nrps_qualifier.domains:
                 feature = record.get_domain_by_name(domain.feature_name)
                 assert isinstance(feature, ModularDomain)
@@ -253,15 +290,14 @@ class NRPS_PKS_Results(ModuleResults):
                 if domain.name in ["AMP-binding", "A-OX"]:
                     self._annotate_a_domain(domain)
                 elif domain.name == "PKS_AT":
-                    self._annotate_at_domain(domain, "transatpks" in cds_feature.region.products)
+                    self._annotate_at_domain(domain, transat_cluster)
                 elif domain.name == "CAL_domain":
                     self._annotate_cal_domain(domain)
                 elif domain.name == "PKS_KR":
                     self._annotate_kr_domain(domain)
                 # otherwise one of many without prediction methods/relevance (PCP, Cglyc, etc)
 
-                for method, pred in domain.predictions.items():
-                    feature.specificity.append("%s: %s" % (method, pred))
+                feature.specificity.extend("%s: %s" % (method, pred) for method, pred in domain.predictions.items())
 
                 mapping = DOMAIN_TYPE_MAPPING.get(domain.name)
                 if mapping:
@@ -271,12 +307,7 @@ class NRPS_PKS_Results(ModuleResults):
             for module in cds_feature.modules:
                 if not module.is_complete():
                     continue
-                substrate = ""
-                for module_domain in module.domains:
-                    consensus = self.consensus.get(module_domain.get_name())
-                    if consensus:
-                        substrate = consensus
-                        break
+                substrate = get_module_substrate(module, self.consensus)
                 if not substrate:  # probably a trans-AT PKS
                     domains = {dom.domain for dom in module.domains}
                     if module.module_type == module.types.PKS and "PKS_AT" not in domains:
@@ -4,10 +4,14 @@
 # for test files, silence irrelevant and noisy pylint warnings
 # pylint: disable=no-self-use,protected-access,missing-docstring
 
+import itertools
+import random
 import unittest
+from unittest.mock import patch
 
-from antismash.common import secmet
+from antismash.common import secmet, subprocessing
 from antismash.common.test.helpers import DummyCDS
+from antismash.config import build_config, destroy_config
 from antismash.detection.nrps_pks_domains import domain_identification
 from antismash.modules.nrps_pks import orderfinder
 
@@ -49,6 +53,9 @@ class TestOrdering(unittest.TestCase):
         genes = {name: DummyCDS(locus_tag=name) for name in orders[0]}
         gene_orders = [[genes[k] for k in order] for order in orders]
         res = orderfinder.rank_biosynthetic_orders(n_terms, c_terms, gene_orders)
+        # all orders are given, so the best order should be found without them
+        best = orderfinder.find_best_order(list(genes.values()), None, None, n_terms, c_terms)
+        assert best == res
         return "".join(gene.locus_tag for gene in res)
 
     def test_permutations_no_start_no_end(self):
@@ -204,6 +211,109 @@ class TestOrdering(unittest.TestCase):
         cdss = [DummyCDS() for i in range(11)]
         with self.assertRaisesRegex(AssertionError, "input too large"):
             orderfinder.find_possible_orders(cdss, None, None)
+        with self.assertRaisesRegex(AssertionError, "input too large"):
+            orderfinder.find_best_order(cdss, None, None, {}, {})
+
+    def test_best_order_C002271_c19(self):  # pylint: disable=invalid-name
+        names = ["STAUR_3972", "STAUR_3982", "STAUR_3983", "STAUR_3984", "STAUR_3985"]
+        cdss = [DummyCDS(start=i*10, end=i*10+1, locus_tag=name) for i, name in enumerate(names)]
+        n_terms = {'STAUR_3972': 'L-', 'STAUR_3982': 'ER',
+                   'STAUR_3983': 'DK', 'STAUR_3984': 'SQ',
+                   'STAUR_3985': 'SV'}
+        c_terms = {'STAUR_3972': 'ES', 'STAUR_3982': '--',
+                   'STAUR_3983': 'DS', 'STAUR_3984': 'DS',
+                   'STAUR_3985': 'DS'}
+        best = orderfinder.find_best_order(cdss, None, cdss[1], n_terms, c_terms)
+        best = [gene.get_name() for gene in best]
+        assert best == ['STAUR_3983', 'STAUR_3972', 'STAUR_3984', 'STAUR_3985', 'STAUR_3982']
+
+    def test_best_order_matches_ranking(self):
+        residues = ["LV", "DK", "KE", "SQ", "AF", "RR", "--"]
+        # including genes sharing a start location, where ties are broken by input order
+        cdss = [DummyCDS(start=start, end=start + 3, locus_tag=str(i))
+                for i, start in enumerate([9, 0, 6, 6, 3, 0])]
+        for shift in range(len(residues)):
+            n_terms = {cds.get_name(): residues[(i + shift) % len(residues)] for i, cds in enumerate(cdss)}
+            c_terms = {cds.get_name(): residues[(i * 3 + shift) % len(residues)] for i, cds in enumerate(cdss)}
+            for start, end in [(None, None), (cdss[2], None), (None, cdss[5]), (cdss[1], cdss[0])]:
+                orders = orderfinder.find_possible_orders(cdss, start, end)
+                expected = orderfinder.rank_biosynthetic_orders(n_terms, c_terms, orders)
+                best = orderfinder.find_best_order(cdss, start, end, n_terms, c_terms)
+                assert [gene.get_name() for gene in best] == [gene.get_name() for gene in expected]
+
+    def test_ranking_lazy_orders(self):
+        genes = [self.gene_mapping[name] for name in "abc"]
+        n_terms = {"a": "LV", "b": "DK", "c": "KE"}
+        c_terms = {"a": "KE", "b": "LV", "c": "DK"}
+        orders = list(orderfinder.find_possible_orders(genes, None, None))
+        expected = orderfinder.rank_biosynthetic_orders(n_terms, c_terms, orders)
+        assert orderfinder.rank_biosynthetic_orders(n_terms, c_terms, iter(orders)) == expected
+        with self.assertRaises(AssertionError):
+            orderfinder.rank_biosynthetic_orders(n_terms, c_terms, iter([]))
+
+    def test_possible_orders_sorted(self):
+        rng = random.Random(7)
+        for starts in [[9, 0, 6, 3], [5, 0, 5, 2, 0]]:
+            for _ in range(5):
+                rng.shuffle(starts)
+                cdss = [DummyCDS(start=start, end=start + 3, locus_tag=str(i)) for i, start in enumerate(starts)]
+                orders = orderfinder.find_possible_orders(cdss, None, cdss[-1])
+                expected = sorted([list(order) + [cdss[-1]] for order in itertools.permutations(cdss[:-1])],
+                                  key=lambda x: [g.location.start for g in x])
+                assert list(orders) == expected
+
+    def test_best_order_only_fixed(self):
+        start, end = self.gene_mapping["a"], self.gene_mapping["b"]
+        assert orderfinder.find_best_order([start, end], start, end, {}, {}) == [start, end]
+        assert orderfinder.find_best_order([end], None, end, {}, {}) == [end]
+
+
+class TestTerminalExtraction(unittest.TestCase):
+    def setUp(self):
+        build_config(["--cpus", "1"])
+        self.genes = [DummyCDS(locus_tag="a", translation="MAGICHAT"),
+                      DummyCDS(locus_tag="b", translation="HATMAGIC")]
+
+    def tearDown(self):
+        destroy_config()
+
+    def fake_muscle(self, name, seq, _ref_file):
+        # a leading gap in the references shifts the extracted positions by one
+        return {name: seq.ljust(101, "-"), "EryAIII_5_6_ref": "-" + "A" * 50, "EryAII_ref": "-" + "A" * 100}
+
+    def test_docking_with_single_unfixed_gene(self):
+        genes = self.genes + [DummyCDS(locus_tag="c", translation="MAGIC")]
+        for gene, domains in zip(genes, [["PKS_KS", "Thioesterase"], ["PKS_KS"], ["PKS_AT", "ACP"]]):
+            gene.nrps_pks = DummyNRPSQualfier()
+            gene.nrps_pks.domain_names = domains
+        with patch.object(subprocessing, "run_muscle_single", side_effect=RuntimeError("unexpected")):
+            order = orderfinder.perform_docking_domain_analysis(genes)
+        assert order == [genes[2], genes[1], genes[0]]
+
+    def test_n_terminus(self):
+        with patch.object(subprocessing, "run_muscle_single", side_effect=self.fake_muscle) as patched:
+            residues = orderfinder.extract_nterminus("data", self.genes, self.genes[0])
+        patched.assert_called_once_with("b", "HATMAGIC", "data/nterm.fasta")
+        assert residues == {"b": "M-"}
+
+    def test_c_terminus(self):
+        self.genes[1].translation = "HATMAGIC" * 8
+        with patch.object(subprocessing, "run_muscle_single", side_effect=self.fake_muscle) as patched:
+            residues = orderfinder.extract_cterminus("data", self.genes, None)
+        assert patched.call_count == 2
+        assert residues == {"a": "--", "b": "H-"}
+
+    def test_nothing_to_align(self):
+        with patch.object(subprocessing, "parallel_function_for_jobs") as patched:
+            assert orderfinder.extract_nterminus("data", self.genes[:1], self.genes[0]) == {}
+        patched.assert_not_called()
+
+    def test_identical_terminals_aligned_once(self):
+        genes = self.genes + [DummyCDS(locus_tag="c", translation="MAGICHAT")]
+        with patch.object(subprocessing, "run_muscle_single", side_effect=self.fake_muscle) as patched:
+            residues = orderfinder.extract_nterminus("data", genes, None)
+            assert patched.call_count == 2
+            assert residues == {"a": "I-", "b": "M-", "c": "I-"}
 
 
 class TestEnzymeCounter(unittest.TestCase):
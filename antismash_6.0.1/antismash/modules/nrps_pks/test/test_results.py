@@ -0,0 +1,42 @@
+# License: GNU Affero General Public License v3 or later
+# A copy of GNU AGPL v3 should have been included in this software package in LICENSE.txt.
+
+# for test files, silence irrelevant and noisy pylint warnings
+# pylint: disable=no-self-use,protected-access,missing-docstring
+
+import unittest
+from unittest.mock import Mock
+
+from antismash.modules.nrps_pks import results
+
+
+class TestBuildMonomer(unittest.TestCase):
+    def build(self, domains, base, methylations=(), is_pks=True):
+        return results._build_monomer(frozenset(domains), tuple(methylations), is_pks, base)
+
+    def test_no_base(self):
+        assert self.build({"PKS_AT", "PKS_KS", "ACP"}, "") == ""
+
+    def test_trans_at(self):
+        assert self.build({"PKS_KS", "ACP"}, "") == "mal"
+
+    def test_reductions(self):
+        assert self.build({"PKS_KS", "PKS_AT", "PKS_KR"}, "mal") == "ohmal"
+        assert self.build({"PKS_KS", "PKS_AT", "PKS_KR", "PKS_DH2"}, "emal") == "ccemal"
+        assert self.build({"PKS_KS", "PKS_AT", "PKS_KR", "PKS_DH", "PKS_ER"}, "mmal") == "Me-redmal"
+        # only PKS modules are reduced
+        assert self.build({"PKS_KS", "PKS_AT", "PKS_KR"}, "mal", is_pks=False) == "mal"
+
+    def test_methylation(self):
+        assert self.build({"MT", "Epimerization"}, "ala", ["oMT", None, "nMT"], is_pks=False) == "D-OMe-NMe-ala"
+
+
+class TestModuleSubstrate(unittest.TestCase):
+    def test_first_with_prediction(self):
+        domains = [Mock(), Mock(), Mock(), Mock()]
+        for i, domain in enumerate(domains):
+            domain.get_name.return_value = "dom%d" % i
+        module = Mock(domains=domains)
+        predictions = {"dom1": "", "dom2": "ala", "dom3": "gly"}
+        assert results.get_module_substrate(module, predictions) == "ala"
+        assert results.get_module_substrate(module, {"dom1": ""}) == ""
@@ -3,6 +3,7 @@
 
 """ HTML generation for the thiopeptides module """
 
+from functools import lru_cache
 from typing import List
 
 from antismash.common import path
@@ -28,6 +29,12 @@ class ThiopeptideLayer(RegionLayer):
                 self.motifs.append(motif)
 
 
+@lru_cache(maxsize=None)
+def _get_template(filename: str) -> FileTemplate:
+    """ Builds the given template on first use, then reuses it for each region """
+    return FileTemplate(path.get_full_path(__file__, "templates", filename))
+
+
 def generate_html(region_layer: RegionLayer, results: ThioResults,
                   record_layer: RecordLayer, options_layer: OptionsLayer
                   ) -> HTMLSections:
@@ -42,7 +49,7 @@ def generate_html(region_layer: RegionLayer, results: ThioResults,
     detail_tooltip = ("Lists the possible core peptides for each biosynthetic enzyme, including the predicted class. "
                       "Each core peptide shows the leader and core peptide sequences, separated by a dash. "
                       "Predicted tail sequences are also shown.")
-    template = FileTemplate(path.get_full_path(__file__, "templates", "details.html"))
+    template = _get_template("details.html")
     details = template.render(record=record_layer,
                               cluster=thio_layer,
                               options=options_layer,
@@ -53,7 +60,7 @@ def generate_html(region_layer: RegionLayer, results: ThioResults,
                     "Each core peptide lists its possible molecular weights "
                     "and the scores for cleavage site prediction and RODEO. "
                     "If relevant, other features, such as macrocycle and amidation, will also be listed.")
-    template = FileTemplate(path.get_full_path(__file__, "templates", "sidepanel.html"))
+    template = _get_template("sidepanel.html")
     sidepanel = template.render(record=record_layer,
                                 cluster=thio_layer,
                                 options=options_layer,
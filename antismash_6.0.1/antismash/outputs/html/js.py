@@ -5,6 +5,7 @@
     JSON for use by the webpage javascript
 """
 
+import heapq
 import os
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
@@ -103,19 +104,22 @@ def convert_cds_features(record: Record, features: Iterable[CDSFeature], options
         # resistance genes have special markers, not just a colouring, so revert to OTHER
         if gene_function == GeneFunction.RESISTANCE:
             gene_function = GeneFunction.OTHER
-        mibig_hits: List[clusterblast.results.MibigEntry] = []
-        mibig_hits = mibig_entries.get(feature.get_name(), [])
-        description = get_description(record, feature, str(gene_function), options, mibig_hits)
-        js_orfs.append({
-            "start": feature.location.start + 1,
-            "end": feature.location.end,
+        function_type = str(gene_function)
+        name = feature.get_name()
+        location = feature.location
+        mibig_hits = mibig_entries.get(name, [])
+        description = get_description(record, feature, function_type, options, mibig_hits)
+        js_orf: Dict[str, Any] = {
+            "start": location.start + 1,
+            "end": location.end,
             "strand": feature.strand or 1,
-            "locus_tag": feature.get_name(),
-            "type": str(gene_function),
+            "locus_tag": name,
+            "type": function_type,
             "description": description,
-        })
+        }
         if feature.gene_functions.get_by_tool("resist"):  # don't add to every gene for size reasons
-            js_orfs[-1]["resistance"] = True
+            js_orf["resistance"] = True
+        js_orfs.append(js_orf)
     return js_orfs
 
 
@@ -139,21 +143,25 @@ def _find_non_overlapping_cluster_groups(collections: Iterable[CDSCollection],
         raise ValueError("padding cannot be negative")
     if not collections:
         return {}
-    groups: List[List[CDSCollection]] = []
-    for collection in collections:
-        found_group = False
-        for group in groups:
-            if collection.location.start > group[-1].location.end + padding:
-                group.append(collection)
-                found_group = True
-                break
-        if not found_group:  # then start a new group
-            groups.append([collection])
-
     results = {}
-    for group_number, group in enumerate(groups):
-        for collection in group:
-            results[collection] = group_number
+    group_count = 0
+    # groups still blocked, by the position each becomes available after
+    blocked: List[Tuple[int, int]] = []
+    # groups that can take the next collection, by group number
+    available: List[int] = []
+    for collection in collections:
+        start = collection.location.start
+        # since collections are sorted, a group that is available stays available
+        # until it has something added to it
+        while blocked and blocked[0][0] < start:
+            heapq.heappush(available, heapq.heappop(blocked)[1])
+        if available:  # the lowest numbered group with space
+            group_number = heapq.heappop(available)
+        else:  # then start a new group
+            group_number = group_count
+            group_count += 1
+        results[collection] = group_number
+        heapq.heappush(blocked, (collection.location.end + padding, group_number))
     return results
 
 
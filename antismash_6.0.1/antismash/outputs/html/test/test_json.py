@@ -63,3 +63,13 @@ class TestClusterPacking(unittest.TestCase):
     def test_bad_padding(self):
         with self.assertRaisesRegex(ValueError, "cannot be negative"):
             self.check([], {}, padding=-1)
+
+    def test_lowest_group_reused(self):
+        # both earlier groups have space, the first should be used even though
+        # the second group became available sooner
+        clusters = [
+            DummyProtocluster(start=100, end=600),
+            DummyProtocluster(start=150, end=300),
+            DummyProtocluster(start=700, end=900),
+        ]
+        self.check(clusters, {clusters[0]: 0, clusters[1]: 1, clusters[2]: 0}, padding=1)